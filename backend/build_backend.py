@@ -48,6 +48,7 @@ def main():
         "--hidden-import=git",
         "--hidden-import=pydantic",
         "--hidden-import=configparser",
+        "--hidden-import=aiohttp",
     ]
     
 
@@ -1,7 +1,7 @@
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, FrozenSet
 from datetime import datetime
 import json
 import requests
@@ -14,9 +14,15 @@ import shutil
 import asyncio
 import re
 import base64
+import hashlib
+import uuid
+import zipfile
+import ntpath
 from fastapi import Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, FileResponse
+from starlette.background import BackgroundTask
+from concurrent.futures import ThreadPoolExecutor
 import sys
 import codecs
 
@@ -65,6 +71,32 @@ except ImportError as e:
     SERVICES_AVAILABLE = False
 
 
+from services.template_copy_service import TemplateCopyService
+from services.job_template_service import JobTemplateService
+from services.product_chunks_service import (
+    ChunkDbRegistry, ExclusionMatcher, MrsStagingWriter, ProductQuestionIndex, ProductTemplateCache,
+    ProductTemplateError, ProductChunksJobManager, KeyedLocks, extract_group_names, diff_variables, clean_label_text,
+    clean_label_texts, response_code_label, get_chunk_db_path, workspace_key
+)
+from services.odin_chunks_service import (
+    ChunkIndexRegistry, ChunkContentCache, ChunkBlockRenderer, OdinStructureCache, OdinStreamRewriter, StreamSummaryStore,
+    OdinBatchReport, decode_chunk_bytes, decode_odin_bytes, detect_odin_encoding, iter_odin_stream,
+    iter_rewritten_segments, rewrite_odin_file
+)
+
+template_copy_service = TemplateCopyService()
+job_template_service = JobTemplateService()
+chunk_index_registry = ChunkIndexRegistry()
+chunk_content_cache = ChunkContentCache()
+odin_stream_summaries = StreamSummaryStore()
+odin_structure_cache = OdinStructureCache()
+chunk_block_renderer = ChunkBlockRenderer()
+chunk_db_registry = ChunkDbRegistry()
+mrs_staging_writer = MrsStagingWriter()
+product_template_cache = ProductTemplateCache()
+product_chunks_jobs = ProductChunksJobManager()
+product_chunks_workspace_locks = KeyedLocks()
+
 
 
 
@@ -190,6 +222,32 @@ class CreateStructureRequest(BaseModel):
 
 
 
+class BatchProjectSpec(BaseModel):
+    project_name: str
+    mdd_file_content: Optional[str] = None
+    mdd_filename: Optional[str] = None
+    ddf_file_content: Optional[str] = None
+    ddf_filename: Optional[str] = None
+    date_start: str = "19991201"
+    date_end: str = "99999999"
+
+class BatchCreateStructureRequest(BaseModel):
+    workspace_path: str
+    projects: List[BatchProjectSpec]
+    template_location: str = ""
+    library_location: str = ""
+    max_parallel: int = 4
+
+
+
+UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+MAX_BATCH_PARALLELISM = 16
+
+ODIN_BATCH_OUTPUT_MODES = ("side_by_side", "zip")
+ODIN_BATCH_SUFFIX = "_processed"
+ODIN_BATCH_REPORT_NAME = "odin_batch_report.json"
+
+
 class CreateStructureResponse(BaseModel):
     success: bool
     message: str
@@ -238,7 +296,9 @@ async def health_create_structure():
         "functions_available": {
             "copy_directory_async": "copy_directory_async" in globals(),
             "create_structure_endpoint": True
-        }
+        },
+        "template_snapshots": template_copy_service.snapshots.describe(),
+        "compiled_templates": job_template_service.describe()
     }
     
     return {
@@ -270,7 +330,10 @@ async def health_check():
             "git_file_diff": "/git/file-diff",
             "azure_download": "/azure/download-files",
             "mdd_duplicate": "/data/duplicate-mdd",
-            "create_structure": "/data-processing/create-structure"
+            "create_structure": "/data-processing/create-structure",
+            "create_structure_stream": "/data-processing/create-structure/stream",
+            "create_structure_upload": "/data-processing/create-structure/upload",
+            "create_structure_batch": "/data-processing/create-structure/batch"
         }
     }
 
@@ -328,7 +391,8 @@ async def validate_workspace(workspace_path: str):
 async def get_branches(
     project_path: str,
     repo: str = "both",  
-    limit: int = 15
+    limit: int = 15,
+    fresh: bool = False
 ):
 
     if not git_service:
@@ -358,7 +422,7 @@ async def get_branches(
         
         
         try:
-            branches = git_service.get_recent_branches(project_path, repo, limit)
+            branches = await git_service.get_recent_branches(project_path, repo, limit, fresh=fresh)
             logger.info(f"✅ Found {len(branches)} branches")
             
             
@@ -398,7 +462,8 @@ async def get_branches(
             "total": len(branches_data),
             "repository_filter": repo,
             "workspace_path": project_path,
-            "available_repositories": validation["repositories"]
+            "available_repositories": validation["repositories"],
+            "fetch_status": git_service.get_fetch_status(project_path, repo)
         }
         
         logger.info(f"📤 Returning response with {len(branches_data)} branches")
@@ -451,7 +516,7 @@ async def fetch_all_repositories(project_path: str):
         if not project_path or not os.path.exists(project_path):
             raise HTTPException(status_code=400, detail="Invalid project path")
         
-        result = git_service.fetch_all_remote_branches(project_path)
+        result = await git_service.fetch_all_remote_branches(project_path)
         logger.info(f"✅ Fetch result: {result}")
         
         return result
@@ -467,7 +532,8 @@ async def fetch_all_repositories(project_path: str):
 async def checkout_branch(
     project_path: str,
     repo_name: str,  
-    branch_name: str
+    branch_name: str,
+    fresh: bool = False
 ):
 
     if not git_service:
@@ -482,7 +548,7 @@ async def checkout_branch(
         if repo_name not in ['content', 'dimensions']:
             raise HTTPException(status_code=400, detail="Repository must be 'content' or 'dimensions'")
         
-        result = git_service.checkout_branch(project_path, repo_name, branch_name)
+        result = await git_service.run_in_pool(git_service.checkout_branch, project_path, repo_name, branch_name, fresh=fresh)
         
         
         result_data = result.dict() if hasattr(result, 'dict') else result
@@ -505,7 +571,9 @@ async def compare_branches(
     project_path: str,
     repo_name: str,  
     branch_name: str,
-    base_branch: str = "master"
+    base_branch: str = "master",
+    fresh: bool = False,
+    mode: str = "numstat"
 ):
 
     if not git_service:
@@ -520,7 +588,10 @@ async def compare_branches(
         if repo_name not in ['content', 'dimensions']:
             raise HTTPException(status_code=400, detail="Repository must be 'content' or 'dimensions'")
         
-        comparison = git_service.compare_branch_with_master(project_path, repo_name, branch_name)
+        if mode not in ['numstat', 'patch']:
+            raise HTTPException(status_code=400, detail="Comparison mode must be 'numstat' or 'patch'")
+        
+        comparison = await git_service.run_in_pool(git_service.compare_branch_with_master, project_path, repo_name, branch_name, fresh=fresh, mode=mode)
         
         
         comparison_data = comparison.dict() if hasattr(comparison, 'dict') else comparison
@@ -530,7 +601,8 @@ async def compare_branches(
         return {
             "success": True,
             "comparison": comparison_data,
-            "summary": f"Comparing {branch_name} with {base_branch} in {repo_name} repository"
+            "summary": f"Comparing {branch_name} with {base_branch} in {repo_name} repository",
+            "fetch_status": git_service.get_fetch_status(project_path, repo_name)
         }
         
     except HTTPException:
@@ -560,7 +632,7 @@ async def get_file_diff_endpoint(
         if repo_name not in ['content', 'dimensions']:
             raise HTTPException(status_code=400, detail="Repository must be 'content' or 'dimensions'")
         
-        diff = git_service.get_file_diff(project_path, repo_name, branch_name, file_path)
+        diff = await git_service.run_in_pool(git_service.get_file_diff, project_path, repo_name, branch_name, file_path)
         
         
         diff_data = diff.dict() if hasattr(diff, 'dict') else diff
@@ -592,7 +664,7 @@ async def get_repository_status(project_path: str):
         if not project_path or not os.path.exists(project_path):
             raise HTTPException(status_code=400, detail="Invalid project path")
         
-        status = git_service.get_repository_status(project_path)
+        status = await git_service.get_repository_status(project_path)
         
         
         status_dict = {}
@@ -613,6 +685,7 @@ async def get_repository_status(project_path: str):
             "success": True,
             "status": status_dict,
             "workspace_path": project_path,
+            "fetch_status": git_service.get_fetch_status(project_path),
             "timestamp": datetime.now().isoformat()
         }
         
@@ -727,235 +800,148 @@ async def create_structure_endpoint(request: CreateStructureRequest):
         print(f"📝 {message}")
     
     try:
-        add_log("🔍 Starting structure creation with MDD and DDF...")
-        
-        
-        
-        
-        
-        
-        project_name = request.project_name.strip()
-        if not project_name:
-            raise HTTPException(status_code=400, detail="Project name is required")
-        
-        if not re.match(r'^[a-zA-Z0-9_-]+$', project_name):
-            raise HTTPException(status_code=400, detail="Invalid project name. Only letters, numbers, underscores, and hyphens allowed.")
-        
-        
-        workspace_path = request.workspace_path.strip()
-        if not workspace_path:
-            raise HTTPException(status_code=400, detail="Workspace path is required")
-            
-        if not os.path.exists(workspace_path):
-            raise HTTPException(status_code=400, detail=f"Workspace not found: {workspace_path}")
-        
-        
-        outputs_content = os.path.join(workspace_path, "outputs-dimensions-content")
-        outputs_dimensions = os.path.join(workspace_path, "outputs-dimensions")
-        
-        if not os.path.exists(outputs_content):
-            raise HTTPException(status_code=400, detail="outputs-dimensions-content repository not found in workspace")
-        
-        if not os.path.exists(outputs_dimensions):
-            raise HTTPException(status_code=400, detail="outputs-dimensions repository not found in workspace")
-        
-        add_log("✅ Basic validations passed")
-        
-        
-        
-        
-        
-        add_log("📋 Processing MDD file...")
-        
-        if not request.mdd_file_content:
-            raise HTTPException(status_code=400, detail="MDD file content is required")
+        result = await build_structure_from_request(request, add_log)
+        result["logs"] = logs
+        return result
         
+    except HTTPException:
+        add_log("❌ Request validation failed")
+        raise
+    except Exception as e:
+        add_log(f"❌ Unexpected error: {str(e)}")
+        print(f"💥 Full error: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@app.post("/data-processing/create-structure/stream")
+async def create_structure_stream_endpoint(request: CreateStructureRequest):
+    print(f"🚀 Creating structure (streaming) for: {request.project_name}")
+    events: asyncio.Queue = asyncio.Queue()
+    logs = []
+    
+    def add_log(message: str):
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        log_entry = f"[{timestamp}] {message}"
+        logs.append(log_entry)
+        print(f"📝 {message}")
+        events.put_nowait({"type": "log", "message": log_entry})
+    
+    def on_progress(event: Dict[str, Any]):
+        events.put_nowait({"type": "progress", **event})
+    
+    async def run_build():
         try:
-            
-            mdd_content = base64.b64decode(request.mdd_file_content)
-            add_log(f"📊 MDD decoded: {len(mdd_content)} bytes")
+            result = await build_structure_from_request(request, add_log, on_progress)
+            result["logs"] = logs
+            events.put_nowait({"type": "result", **result})
+        except HTTPException as e:
+            add_log("❌ Request validation failed")
+            events.put_nowait({"type": "error", "status_code": e.status_code, "detail": e.detail})
         except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Invalid MDD file encoding: {str(e)}")
-        
-        if len(mdd_content) == 0:
-            raise HTTPException(status_code=400, detail="MDD file is empty")
-        
-        
-        if not request.mdd_filename:
-            raise HTTPException(status_code=400, detail="MDD filename is required")
-        
-        if not request.mdd_filename.lower().endswith('.mdd'):
-            raise HTTPException(status_code=400, detail="MDD file must have .mdd extension")
-        
-        
-        
-        
-        
-        add_log("💾 Processing DDF file...")
-        
-        if not request.ddf_file_content:
-            raise HTTPException(status_code=400, detail="DDF file content is required")
-        
+            add_log(f"❌ Unexpected error: {str(e)}")
+            events.put_nowait({"type": "error", "status_code": 500, "detail": f"Internal server error: {str(e)}"})
+        finally:
+            events.put_nowait(None)
+    
+    async def event_stream():
+        task = asyncio.create_task(run_build())
         try:
-            
-            ddf_content = base64.b64decode(request.ddf_file_content)
-            add_log(f"📊 DDF decoded: {len(ddf_content)} bytes")
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Invalid DDF file encoding: {str(e)}")
-        
-        if len(ddf_content) == 0:
-            raise HTTPException(status_code=400, detail="DDF file is empty")
-        
-        
-        if not request.ddf_filename:
-            raise HTTPException(status_code=400, detail="DDF filename is required")
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield json.dumps(event, default=str) + "\n"
+        finally:
+            if not task.done():
+                task.cancel()
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+
+@app.post("/data-processing/create-structure/upload")
+async def create_structure_upload_endpoint(
+    mdd_file: UploadFile = File(..., description="MDD metadata file"),
+    ddf_file: UploadFile = File(..., description="DDF data file"),
+    project_name: str = Form(..., description="Project name"),
+    workspace_path: str = Form(..., description="Workspace path"),
+    template_location: str = Form(default=""),
+    library_location: str = Form(default=""),
+    date_start: str = Form(default="19991201"),
+    date_end: str = Form(default="99999999")
+):
+    print(f"🚀 Creating structure (upload) for: {project_name}")
+    logs = []
+    
+    def add_log(message: str):
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        log_entry = f"[{timestamp}] {message}"
+        logs.append(log_entry)
+        print(f"📝 {message}")
+    
+    try:
+        add_log("🔍 Starting structure creation from uploaded MDD and DDF...")
         
-        if not request.ddf_filename.lower().endswith('.ddf'):
-            raise HTTPException(status_code=400, detail="DDF file must have .ddf extension")
+        project_name, workspace_path, outputs_content, outputs_dimensions = validate_structure_target(
+            project_name, workspace_path
+        )
         
+        add_log("✅ Basic validations passed")
         
-        mdd_basename = os.path.splitext(request.mdd_filename)[0]
-        ddf_basename = os.path.splitext(request.ddf_filename)[0]
         
-        if mdd_basename != ddf_basename:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"File base names must match. MDD: '{mdd_basename}', DDF: '{ddf_basename}'"
-            )
+        mdd_filename = os.path.basename(mdd_file.filename or "")
+        ddf_filename = os.path.basename(ddf_file.filename or "")
         
+        mdd_basename = validate_mdd_ddf_filenames(mdd_filename, ddf_filename)
         add_log(f"✅ File names match: {mdd_basename}")
         
+        mdd_size = measure_upload(mdd_file)
+        if mdd_size == 0:
+            raise HTTPException(status_code=400, detail="MDD file is empty")
         
+        ddf_size = measure_upload(ddf_file)
+        if ddf_size == 0:
+            raise HTTPException(status_code=400, detail="DDF file is empty")
         
+        add_log(f"📊 Uploads received - MDD: {mdd_size} bytes, DDF: {ddf_size} bytes")
         
         
-        template_location = request.template_location or os.path.join(outputs_content, "Template_Configuration")
-        library_location = request.library_location or os.path.join(outputs_dimensions, "KAPLibrary")
-        
-        template_project_path = os.path.join(outputs_dimensions, "Template_Project")
-        
-        
-        if not os.path.exists(template_location):
-            raise HTTPException(status_code=400, detail=f"Template_Configuration not found: {template_location}")
-        
-        if not os.path.exists(template_project_path):
-            raise HTTPException(status_code=400, detail=f"Template_Project not found: {template_project_path}")
+        template_location, library_location, template_project_path = resolve_template_locations(
+            outputs_content, outputs_dimensions, template_location, library_location
+        )
         
         add_log("✅ Paths validated")
         
         
+        templates = await load_structure_templates(template_project_path, template_location, library_location)
         
-        
-        
-        add_log("🏗️ Creating project structure...")
-        
-        
-        projects_path = os.path.join(outputs_content, "Projects")
-        os.makedirs(projects_path, exist_ok=True)
-        
-        
-        new_project_path = os.path.join(projects_path, project_name)
-        
-        if os.path.exists(new_project_path):
-            raise HTTPException(status_code=400, detail=f"Project '{project_name}' already exists")
-        
-        add_log(f"📂 Creating project at: {new_project_path}")
-        
-        
-        add_log("📋 Copying Template_Project...")
-        await copy_directory_async(template_project_path, new_project_path, add_log)
-        
-        
-        automation_path = os.path.join(new_project_path, "Automation")
-        add_log("⚙️ Copying configuration...")
-        
-        
-        await copy_directory_async(template_location, automation_path, add_log)
-        
-        
-        
-        
-        
-        job_ini_path = os.path.join(new_project_path, "job.ini")
-        files_created = ["Project structure"]
-        
-        if os.path.exists(job_ini_path):
-            add_log("🔧 Configuring job.ini...")
-            
-            try:
-                with open(job_ini_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                
-                template_location_normalized = template_location.replace('/', '\\') + '\\'
-                library_location_normalized = library_location.replace('/', '\\') + '\\'
-                
-                
-                replacements = {
-                    "[CHANGE|DATESTART]": request.date_start,
-                    "[CHANGE|DATEEND]": request.date_end,
-                    "[CHANGE|TEMPLATE_LOCATION]": template_location_normalized,
-                    "[CHANGE|LIBRARY_LOCATION]": library_location_normalized,
-                    "[CHANGE|PROJCODE]": project_name,
-                    "[CHANGE|ANALYSIS_SERVER]": template_location_normalized
-                }
-                
-                for old, new in replacements.items():
-                    if old in content:
-                        content = content.replace(old, new)
-                        add_log(f"🔄 Replaced {old}")
-                
-                with open(job_ini_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                
-                files_created.append("job.ini (configured)")
-                add_log("✅ job.ini configured")
-                
-            except Exception as e:
-                add_log(f"⚠️ Warning: Could not configure job.ini: {str(e)}")
-        
-        
-        
+        new_project_path, automation_path, files_created = await create_project_tree(
+            project_name, outputs_content, templates, date_start, date_end, add_log
+        )
         
         
         mdd_folder = os.path.join(new_project_path, "MDD")
-        add_log("💾 Saving MDD and DDF files...")
-
+        add_log("💾 Streaming MDD and DDF files...")
+        
         try:
-            
             os.makedirs(mdd_folder, exist_ok=True)
-            add_log(f"📁 MDD folder ensured: {mdd_folder}")
-
             
-            mdd_path = os.path.join(mdd_folder, request.mdd_filename)
-            with open(mdd_path, 'wb') as f:
-                f.write(mdd_content)
-
-            files_created.append(f"MDD/{request.mdd_filename}")
-            add_log(f"📋 MDD file saved: {request.mdd_filename}")
-
+            mdd_path = os.path.join(mdd_folder, mdd_filename)
+            mdd_result = await stream_upload_to_file(mdd_file, mdd_path)
+            files_created.append(f"MDD/{mdd_filename}")
+            add_log(f"📋 MDD file saved: {mdd_filename} (sha256 {mdd_result['sha256'][:12]}…)")
             
-            ddf_path = os.path.join(mdd_folder, request.ddf_filename)
-            with open(ddf_path, 'wb') as f:
-                f.write(ddf_content)
-
-            files_created.append(f"MDD/{request.ddf_filename}")
-            add_log(f"💾 DDF file saved: {request.ddf_filename}")
-
+            ddf_path = os.path.join(mdd_folder, ddf_filename)
+            ddf_result = await stream_upload_to_file(ddf_file, ddf_path)
+            files_created.append(f"MDD/{ddf_filename}")
+            add_log(f"💾 DDF file saved: {ddf_filename} (sha256 {ddf_result['sha256'][:12]}…)")
             
-            if os.path.exists(mdd_path) and os.path.exists(ddf_path):
-                add_log(f"✅ Both files confirmed saved in: {mdd_folder}")
-            else:
-                add_log(f"⚠️ File verification failed - MDD exists: {os.path.exists(mdd_path)}, DDF exists: {os.path.exists(ddf_path)}")
-
         except Exception as e:
             add_log(f"⚠️ Warning: Could not save MDD/DDF files: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Failed to save MDD/DDF files: {str(e)}")
         
         
-        
-        
-        
         add_log("🎉 Structure created successfully with MDD and DDF!")
         
         return {
@@ -968,11 +954,15 @@ async def create_structure_endpoint(request: CreateStructureRequest):
                 "workspace": workspace_path,
                 "template_location": template_location,
                 "library_location": library_location,
-                "mdd_file": request.mdd_filename,
-                "ddf_file": request.ddf_filename,  
+                "mdd_file": mdd_filename,
+                "ddf_file": ddf_filename,
                 "automation_path": automation_path,
-                "mdd_path": os.path.join(mdd_folder, request.mdd_filename) if os.path.exists(mdd_folder) else None,
-                "ddf_path": os.path.join(mdd_folder, request.ddf_filename) if os.path.exists(mdd_folder) else None
+                "mdd_path": mdd_path,
+                "ddf_path": ddf_path,
+                "checksums": {
+                    "mdd": mdd_result,
+                    "ddf": ddf_result
+                }
             },
             "logs": logs
         }
@@ -988,73 +978,635 @@ async def create_structure_endpoint(request: CreateStructureRequest):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-async def copy_directory_async(source: str, destination: str, add_log, batch_size: int = 20):
+def measure_upload(upload: UploadFile) -> int:
+
+    upload.file.seek(0, os.SEEK_END)
+    size = upload.file.tell()
+    upload.file.seek(0)
+    return size
+
 
+def copy_stream_with_checksum(source, destination: str, chunk_size: int = UPLOAD_CHUNK_SIZE) -> Dict[str, Any]:
+
+    digest = hashlib.sha256()
+    total_bytes = 0
+    partial_path = destination + ".part"
     
-    if not os.path.exists(source):
-        raise Exception(f"Source directory does not exist: {source}")
+    try:
+        source.seek(0)
+        with open(partial_path, 'wb') as target:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                target.write(chunk)
+                total_bytes += len(chunk)
+        
+        os.replace(partial_path, destination)
+        
+    except Exception:
+        if os.path.exists(partial_path):
+            os.unlink(partial_path)
+        raise
     
-    add_log(f"📁 Copying: {os.path.basename(source)} → {os.path.basename(destination)}")
+    return {
+        "bytes": total_bytes,
+        "sha256": digest.hexdigest()
+    }
+
+
+async def stream_upload_to_file(upload: UploadFile, destination: str) -> Dict[str, Any]:
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, copy_stream_with_checksum, upload.file, destination)
+
+
+@app.post("/data-processing/create-structure/batch")
+async def create_structure_batch_endpoint(request: BatchCreateStructureRequest):
+    print(f"🚀 Creating {len(request.projects)} structures in batch")
+    logs = []
+    started = datetime.now()
     
-    file_count = 0
+    def add_log(message: str):
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        log_entry = f"[{timestamp}] {message}"
+        logs.append(log_entry)
+        print(f"📝 {message}")
     
     try:
-        for root, dirs, files in os.walk(source):
+        add_log(f"🔍 Starting batch structure creation for {len(request.projects)} projects...")
+        
+        if not request.projects:
+            raise HTTPException(status_code=400, detail="At least one project is required")
+        
+        workspace_path, outputs_content, outputs_dimensions = validate_structure_workspace(request.workspace_path)
+        
+        template_location, library_location, template_project_path = resolve_template_locations(
+            outputs_content, outputs_dimensions, request.template_location, request.library_location
+        )
+        
+        add_log("✅ Workspace and template paths validated")
+        
+        
+        templates = await load_structure_templates(template_project_path, template_location, library_location)
+        add_log(f"📸 Templates loaded once: {len(templates['project_snapshot'].files)} project files, "
+                f"{len(templates['configuration_snapshot'].files)} configuration files")
+        
+        
+        max_parallel = max(1, min(request.max_parallel, MAX_BATCH_PARALLELISM))
+        semaphore = asyncio.Semaphore(max_parallel)
+        seen_names = set()
+        
+        async def prepare_one(spec: BatchProjectSpec) -> Tuple[BatchProjectSpec, Dict[str, Any], Any, Optional[List[Tuple[str, bytes]]]]:
+            project_logs = []
             
-            for dir_name in dirs:
-                src_dir = os.path.join(root, dir_name)
-                rel_dir = os.path.relpath(src_dir, source)
-                dest_dir = os.path.join(destination, rel_dir)
-                os.makedirs(dest_dir, exist_ok=True)
+            def add_project_log(message: str):
+                timestamp = datetime.now().strftime("%H:%M:%S")
+                project_logs.append(f"[{timestamp}] {message}")
             
+            result = {
+                "project_name": spec.project_name,
+                "success": False,
+                "project_path": None,
+                "files_created": [],
+                "error": None,
+                "logs": project_logs
+            }
             
-            for i in range(0, len(files), batch_size):
-                batch_files = files[i:i + batch_size]
+            try:
+                project_name = validate_project_name(spec.project_name)
+                result["project_name"] = project_name
+                
+                if project_name.lower() in seen_names:
+                    raise HTTPException(status_code=400, detail=f"Project '{project_name}' is duplicated in this batch")
+                seen_names.add(project_name.lower())
                 
-                for file_name in batch_files:
-                    src_file = os.path.join(root, file_name)
-                    rel_file = os.path.relpath(src_file, source)
-                    dest_file = os.path.join(destination, rel_file)
+                payloads = []
+                if spec.mdd_file_content or spec.ddf_file_content:
+                    if not spec.mdd_file_content or not spec.ddf_file_content:
+                        raise HTTPException(status_code=400, detail="Both MDD and DDF contents are required when files are provided")
+                    validate_mdd_ddf_filenames(spec.mdd_filename, spec.ddf_filename)
                     
-                    dest_dir = os.path.dirname(dest_file)
-                    os.makedirs(dest_dir, exist_ok=True)
+                    loop = asyncio.get_running_loop()
+                    for filename, encoded in ((spec.mdd_filename, spec.mdd_file_content),
+                                              (spec.ddf_filename, spec.ddf_file_content)):
+                        content = await loop.run_in_executor(None, decode_batch_payload, filename, encoded)
+                        payloads.append((filename, content))
+                
+                return spec, result, add_project_log, payloads
+                
+            except HTTPException as e:
+                result["error"] = e.detail
+                add_project_log(f"❌ {e.detail}")
+            except Exception as e:
+                result["error"] = str(e)
+                add_project_log(f"❌ Unexpected error: {str(e)}")
+            
+            return spec, result, add_project_log, None
+        
+        async def create_one(spec: BatchProjectSpec, result: Dict[str, Any], add_project_log, payloads: Optional[List[Tuple[str, bytes]]]) -> Dict[str, Any]:
+            if payloads is None:
+                return result
+            
+            try:
+                async with semaphore:
+                    new_project_path, _, files_created = await create_project_tree(
+                        result["project_name"], outputs_content, templates, spec.date_start, spec.date_end, add_project_log
+                    )
+                    result["project_path"] = new_project_path
                     
-                    shutil.copy2(src_file, dest_file)
-                    file_count += 1
+                    if payloads:
+                        mdd_folder = os.path.join(new_project_path, "MDD")
+                        loop = asyncio.get_running_loop()
+                        
+                        for filename, content in payloads:
+                            await loop.run_in_executor(
+                                None, write_bytes_to_file, os.path.join(mdd_folder, filename), content
+                            )
+                            files_created.append(f"MDD/{filename}")
+                            add_project_log(f"💾 Saved {filename}")
                 
+                result["files_created"] = files_created
+                result["success"] = True
+                add_project_log("🎉 Structure created")
                 
-                if len(files) > batch_size:
-                    await asyncio.sleep(0.01)
+            except HTTPException as e:
+                result["error"] = e.detail
+                add_project_log(f"❌ {e.detail}")
+            except Exception as e:
+                result["error"] = str(e)
+                add_project_log(f"❌ Unexpected error: {str(e)}")
+            
+            return result
         
-        add_log(f"✅ Copied {file_count} files")
+        # Every name and payload is checked before any project folder is written, so a bad
+        # payload cannot leave a half-built project behind that blocks a retry of the batch
+        add_log("🔍 Validating project names and decoding payloads...")
+        prepared = await asyncio.gather(*(prepare_one(spec) for spec in request.projects))
         
-    except Exception as e:
-        add_log(f"❌ Error copying: {str(e)}")
+        add_log(f"🏗️ Creating projects with parallelism {max_parallel}...")
+        results = await asyncio.gather(*(create_one(*entry) for entry in prepared))
+        
+        succeeded = len([r for r in results if r["success"]])
+        failed = len(results) - succeeded
+        elapsed = (datetime.now() - started).total_seconds()
+        
+        add_log(f"✅ Batch finished: {succeeded} created, {failed} failed in {elapsed:.2f}s")
+        
+        return {
+            "success": failed == 0,
+            "message": f"Created {succeeded} of {len(results)} projects",
+            "data": {
+                "workspace": workspace_path,
+                "template_location": template_location,
+                "library_location": library_location,
+                "max_parallel": max_parallel,
+                "total": len(results),
+                "succeeded": succeeded,
+                "failed": failed,
+                "elapsed_seconds": round(elapsed, 3),
+                "results": results
+            },
+            "logs": logs
+        }
+        
+    except HTTPException:
+        add_log("❌ Request validation failed")
         raise
+    except Exception as e:
+        add_log(f"❌ Unexpected error: {str(e)}")
+        print(f"💥 Full error: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+def decode_batch_payload(filename: str, encoded: str) -> bytes:
 
+    try:
+        content = base64.b64decode(encoded)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid encoding for {filename}: {str(e)}")
+    
+    if len(content) == 0:
+        raise HTTPException(status_code=400, detail=f"{filename} is empty")
+    
+    return content
 
 
+def write_bytes_to_file(file_path: str, content: bytes):
 
-@app.get("/test/create-structure-mdd-ddf")
-async def test_create_structure_with_mdd_ddf():
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'wb') as f:
+        f.write(content)
 
+
+async def build_structure_from_request(request: CreateStructureRequest, add_log, on_progress=None) -> Dict[str, Any]:
+
+    add_log("🔍 Starting structure creation with MDD and DDF...")
     
-    return {
-        "endpoint_available": True,
-        "url": "/data-processing/create-structure",
-        "method": "POST", 
-        "content_type": "application/json",
-        "supports_mdd_ddf": True,
-        "required_fields": {
-            "project_name": "str (required)",
-            "workspace_path": "str (required)",
-            "mdd_file_content": "str (required, base64 encoded)",
-            "mdd_filename": "str (required, must end with .mdd)",
-            "ddf_file_content": "str (required, base64 encoded)",  
-            "ddf_filename": "str (required, must end with .ddf)"     
-        },
+    
+    
+    
+    
+    
+    project_name, workspace_path, outputs_content, outputs_dimensions = validate_structure_target(
+        request.project_name, request.workspace_path
+    )
+    
+    add_log("✅ Basic validations passed")
+    
+    
+    
+    
+    
+    add_log("📋 Processing MDD file...")
+    
+    if not request.mdd_file_content:
+        raise HTTPException(status_code=400, detail="MDD file content is required")
+    
+    try:
+        
+        mdd_content = base64.b64decode(request.mdd_file_content)
+        add_log(f"📊 MDD decoded: {len(mdd_content)} bytes")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid MDD file encoding: {str(e)}")
+    
+    if len(mdd_content) == 0:
+        raise HTTPException(status_code=400, detail="MDD file is empty")
+    
+    
+    
+    
+    
+    add_log("💾 Processing DDF file...")
+    
+    if not request.ddf_file_content:
+        raise HTTPException(status_code=400, detail="DDF file content is required")
+    
+    try:
+        
+        ddf_content = base64.b64decode(request.ddf_file_content)
+        add_log(f"📊 DDF decoded: {len(ddf_content)} bytes")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid DDF file encoding: {str(e)}")
+    
+    if len(ddf_content) == 0:
+        raise HTTPException(status_code=400, detail="DDF file is empty")
+    
+    
+    mdd_basename = validate_mdd_ddf_filenames(request.mdd_filename, request.ddf_filename)
+    add_log(f"✅ File names match: {mdd_basename}")
+    
+    
+    
+    
+    
+    template_location, library_location, template_project_path = resolve_template_locations(
+        outputs_content, outputs_dimensions, request.template_location, request.library_location
+    )
+    
+    add_log("✅ Paths validated")
+    
+    
+    
+    
+    
+    templates = await load_structure_templates(template_project_path, template_location, library_location)
+    
+    new_project_path, automation_path, files_created = await create_project_tree(
+        project_name, outputs_content, templates, request.date_start, request.date_end, add_log, on_progress
+    )
+    
+    
+    
+    
+    
+    mdd_folder = os.path.join(new_project_path, "MDD")
+    add_log("💾 Saving MDD and DDF files...")
+
+    try:
+        
+        os.makedirs(mdd_folder, exist_ok=True)
+        add_log(f"📁 MDD folder ensured: {mdd_folder}")
+
+        
+        mdd_path = os.path.join(mdd_folder, request.mdd_filename)
+        with open(mdd_path, 'wb') as f:
+            f.write(mdd_content)
+
+        files_created.append(f"MDD/{request.mdd_filename}")
+        add_log(f"📋 MDD file saved: {request.mdd_filename}")
+
+        
+        ddf_path = os.path.join(mdd_folder, request.ddf_filename)
+        with open(ddf_path, 'wb') as f:
+            f.write(ddf_content)
+
+        files_created.append(f"MDD/{request.ddf_filename}")
+        add_log(f"💾 DDF file saved: {request.ddf_filename}")
+
+        
+        if os.path.exists(mdd_path) and os.path.exists(ddf_path):
+            add_log(f"✅ Both files confirmed saved in: {mdd_folder}")
+        else:
+            add_log(f"⚠️ File verification failed - MDD exists: {os.path.exists(mdd_path)}, DDF exists: {os.path.exists(ddf_path)}")
+
+    except Exception as e:
+        add_log(f"⚠️ Warning: Could not save MDD/DDF files: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to save MDD/DDF files: {str(e)}")
+    
+    
+    
+    
+    
+    add_log("🎉 Structure created successfully with MDD and DDF!")
+    
+    return {
+        "success": True,
+        "message": "✅ Project structure created successfully with MDD and DDF files!",
+        "data": {
+            "project_path": new_project_path,
+            "project_name": project_name,
+            "files_created": files_created,
+            "workspace": workspace_path,
+            "template_location": template_location,
+            "library_location": library_location,
+            "mdd_file": request.mdd_filename,
+            "ddf_file": request.ddf_filename,  
+            "automation_path": automation_path,
+            "mdd_path": os.path.join(mdd_folder, request.mdd_filename) if os.path.exists(mdd_folder) else None,
+            "ddf_path": os.path.join(mdd_folder, request.ddf_filename) if os.path.exists(mdd_folder) else None
+        }
+    }
+
+
+def validate_structure_target(project_name: str, workspace_path: str) -> Tuple[str, str, str, str]:
+
+    project_name = validate_project_name(project_name)
+    workspace_path, outputs_content, outputs_dimensions = validate_structure_workspace(workspace_path)
+    
+    return project_name, workspace_path, outputs_content, outputs_dimensions
+
+
+def validate_project_name(project_name: str) -> str:
+
+    project_name = (project_name or "").strip()
+    if not project_name:
+        raise HTTPException(status_code=400, detail="Project name is required")
+    
+    if not re.match(r'^[a-zA-Z0-9_-]+$', project_name):
+        raise HTTPException(status_code=400, detail="Invalid project name. Only letters, numbers, underscores, and hyphens allowed.")
+    
+    return project_name
+
+
+def validate_structure_workspace(workspace_path: str) -> Tuple[str, str, str]:
+
+    workspace_path = (workspace_path or "").strip()
+    if not workspace_path:
+        raise HTTPException(status_code=400, detail="Workspace path is required")
+        
+    if not os.path.exists(workspace_path):
+        raise HTTPException(status_code=400, detail=f"Workspace not found: {workspace_path}")
+    
+    
+    outputs_content = os.path.join(workspace_path, "outputs-dimensions-content")
+    outputs_dimensions = os.path.join(workspace_path, "outputs-dimensions")
+    
+    if not os.path.exists(outputs_content):
+        raise HTTPException(status_code=400, detail="outputs-dimensions-content repository not found in workspace")
+    
+    if not os.path.exists(outputs_dimensions):
+        raise HTTPException(status_code=400, detail="outputs-dimensions repository not found in workspace")
+    
+    return workspace_path, outputs_content, outputs_dimensions
+
+
+def validate_mdd_ddf_filenames(mdd_filename: str, ddf_filename: str) -> str:
+
+    if not mdd_filename:
+        raise HTTPException(status_code=400, detail="MDD filename is required")
+    
+    if not mdd_filename.lower().endswith('.mdd'):
+        raise HTTPException(status_code=400, detail="MDD file must have .mdd extension")
+    
+    if not ddf_filename:
+        raise HTTPException(status_code=400, detail="DDF filename is required")
+    
+    if not ddf_filename.lower().endswith('.ddf'):
+        raise HTTPException(status_code=400, detail="DDF file must have .ddf extension")
+    
+    
+    mdd_basename = os.path.splitext(mdd_filename)[0]
+    ddf_basename = os.path.splitext(ddf_filename)[0]
+    
+    if mdd_basename != ddf_basename:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"File base names must match. MDD: '{mdd_basename}', DDF: '{ddf_basename}'"
+        )
+    
+    return mdd_basename
+
+
+def resolve_template_locations(outputs_content: str, outputs_dimensions: str,
+                               template_location: str = "", library_location: str = "") -> Tuple[str, str, str]:
+
+    template_location = template_location or os.path.join(outputs_content, "Template_Configuration")
+    library_location = library_location or os.path.join(outputs_dimensions, "KAPLibrary")
+    
+    template_project_path = os.path.join(outputs_dimensions, "Template_Project")
+    
+    
+    if not os.path.exists(template_location):
+        raise HTTPException(status_code=400, detail=f"Template_Configuration not found: {template_location}")
+    
+    if not os.path.exists(template_project_path):
+        raise HTTPException(status_code=400, detail=f"Template_Project not found: {template_project_path}")
+    
+    return template_location, library_location, template_project_path
+
+
+async def load_structure_templates(template_project_path: str, template_location: str,
+                                   library_location: str) -> Dict[str, Any]:
+
+    project_snapshot = await template_copy_service.get_snapshot(template_project_path)
+    configuration_snapshot = await template_copy_service.get_snapshot(template_location)
+    
+    loop = asyncio.get_running_loop()
+    project_templates, project_errors = await loop.run_in_executor(
+        None, job_template_service.load_templates, project_snapshot.source, [rel for rel, _ in project_snapshot.files]
+    )
+    configuration_templates, configuration_errors = await loop.run_in_executor(
+        None, job_template_service.load_templates, configuration_snapshot.source, [rel for rel, _ in configuration_snapshot.files]
+    )
+    
+    return {
+        "template_project_path": template_project_path,
+        "template_location": template_location,
+        "library_location": library_location,
+        "project_snapshot": project_snapshot,
+        "configuration_snapshot": configuration_snapshot,
+        "project_templates": project_templates,
+        "project_template_errors": project_errors,
+        "configuration_templates": configuration_templates,
+        "configuration_template_errors": configuration_errors
+    }
+
+
+def build_job_ini_replacements(project_name: str, templates: Dict[str, Any],
+                               date_start: str, date_end: str) -> Dict[str, str]:
+
+    template_location_normalized = templates["template_location"].replace('/', '\\') + '\\'
+    library_location_normalized = templates["library_location"].replace('/', '\\') + '\\'
+    
+    return {
+        "DATESTART": date_start,
+        "DATEEND": date_end,
+        "TEMPLATE_LOCATION": template_location_normalized,
+        "LIBRARY_LOCATION": library_location_normalized,
+        "PROJCODE": project_name,
+        "ANALYSIS_SERVER": template_location_normalized
+    }
+
+
+def render_project_templates(destination: str, compiled_templates, errors: Dict[str, str],
+                             values: Dict[str, str], add_log, label_prefix: str = "") -> List[str]:
+
+    configured = []
+    
+    for compiled in compiled_templates:
+        label = label_prefix + compiled.relative_path.replace(os.sep, '/')
+        target_path = os.path.join(destination, compiled.relative_path)
+        
+        if not os.path.exists(target_path):
+            continue
+        
+        add_log(f"🔧 Configuring {label}...")
+        
+        try:
+            content, replaced = compiled.render(values)
+            
+            for key in replaced:
+                add_log(f"🔄 Replaced [CHANGE|{key}]")
+            
+            with open(target_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            
+            configured.append(f"{label} (configured)")
+            add_log(f"✅ {label} configured")
+            
+        except Exception as e:
+            add_log(f"⚠️ Warning: Could not configure {label}: {str(e)}")
+    
+    for relative_path, error in errors.items():
+        if os.path.exists(os.path.join(destination, relative_path)):
+            add_log(f"⚠️ Warning: Could not configure {label_prefix}{relative_path.replace(os.sep, '/')}: {error}")
+    
+    return configured
+
+
+async def create_project_tree(project_name: str, outputs_content: str, templates: Dict[str, Any],
+                              date_start: str, date_end: str, add_log, on_progress=None) -> Tuple[str, str, List[str]]:
+
+    add_log("🏗️ Creating project structure...")
+    
+    
+    projects_path = os.path.join(outputs_content, "Projects")
+    os.makedirs(projects_path, exist_ok=True)
+    
+    
+    new_project_path = os.path.join(projects_path, project_name)
+    
+    if os.path.exists(new_project_path):
+        raise HTTPException(status_code=400, detail=f"Project '{project_name}' already exists")
+    
+    add_log(f"📂 Creating project at: {new_project_path}")
+    
+    
+    add_log("📋 Copying Template_Project...")
+    await copy_template_snapshot(templates["project_snapshot"], new_project_path, add_log, on_progress)
+    
+    
+    automation_path = os.path.join(new_project_path, "Automation")
+    add_log("⚙️ Copying configuration...")
+    
+    
+    await copy_template_snapshot(templates["configuration_snapshot"], automation_path, add_log, on_progress)
+    
+    
+    
+    
+    
+    files_created = ["Project structure"]
+    values = build_job_ini_replacements(project_name, templates, date_start, date_end)
+    
+    files_created.extend(render_project_templates(
+        new_project_path, templates["project_templates"], templates["project_template_errors"], values, add_log
+    ))
+    files_created.extend(render_project_templates(
+        automation_path, templates["configuration_templates"], templates["configuration_template_errors"],
+        values, add_log, "Automation/"
+    ))
+    
+    return new_project_path, automation_path, files_created
+
+
+async def copy_directory_async(source: str, destination: str, add_log, on_progress=None):
+
+    
+    if not os.path.exists(source):
+        raise Exception(f"Source directory does not exist: {source}")
+    
+    snapshot = await template_copy_service.get_snapshot(source)
+    return await copy_template_snapshot(snapshot, destination, add_log, on_progress)
+
+
+async def copy_template_snapshot(snapshot, destination: str, add_log, on_progress=None):
+
+    add_log(f"📁 Copying: {os.path.basename(snapshot.source)} → {os.path.basename(destination)}")
+    
+    try:
+        stats = await template_copy_service.copy_snapshot(snapshot, destination, on_progress)
+        
+        methods = ", ".join(f"{method}: {count}" for method, count in sorted(stats["methods"].items()))
+        add_log(f"✅ Copied {stats['files']} files in {stats['elapsed_seconds']}s" + (f" ({methods})" if methods else ""))
+        return stats
+        
+    except Exception as e:
+        add_log(f"❌ Error copying: {str(e)}")
+        raise
+
+
+
+
+
+@app.get("/test/create-structure-mdd-ddf")
+async def test_create_structure_with_mdd_ddf():
+
+    
+    return {
+        "endpoint_available": True,
+        "url": "/data-processing/create-structure",
+        "method": "POST", 
+        "content_type": "application/json",
+        "supports_mdd_ddf": True,
+        "multipart_variant": {
+            "url": "/data-processing/create-structure/upload",
+            "content_type": "multipart/form-data",
+            "file_fields": ["mdd_file", "ddf_file"],
+            "note": "Files are streamed to Projects/<name>/MDD/ in fixed-size chunks with a SHA-256 checksum"
+        },
+        "required_fields": {
+            "project_name": "str (required)",
+            "workspace_path": "str (required)",
+            "mdd_file_content": "str (required, base64 encoded)",
+            "mdd_filename": "str (required, must end with .mdd)",
+            "ddf_file_content": "str (required, base64 encoded)",  
+            "ddf_filename": "str (required, must end with .ddf)"     
+        },
         "optional_fields": {
             "template_location": "str (optional)",
             "library_location": "str (optional)",
@@ -1638,7 +2190,10 @@ async def get_services_status():
         },
         "git_service": {
             "available": git_service is not None,
-            "status": "active" if git_service else "unavailable"
+            "status": "active" if git_service else "unavailable",
+            "commit_graph": git_service.commit_graph.describe() if git_service else None,
+            "fetch_scheduler": git_service.fetch_scheduler.describe() if git_service else None,
+            "repo_pool": git_service.repo_pool.describe() if git_service else None
         },
         "azure_service": {
             "available": azure_service is not None,
@@ -1691,7 +2246,10 @@ async def test_endpoint():
                 "/product/validate-kapid"
             ],
             "structure": [
-                "/data-processing/create-structure"
+                "/data-processing/create-structure",
+                "/data-processing/create-structure/stream",
+                "/data-processing/create-structure/upload",
+                "/data-processing/create-structure/batch"
             ]
         }
     }
@@ -1805,66 +2363,43 @@ def read_file_with_encoding_simple(file_path):
     with open(file_path, 'rb') as f:
         content = f.read()
     
-    
-    if content.startswith(b'\xff\xfe'):
-        return content.decode('utf-16-le').replace('\ufeff', '')
-    elif content.startswith(b'\xfe\xff'):
-        return content.decode('utf-16-be').replace('\ufeff', '')
-    else:
-        return content.decode('utf-8', errors='ignore')
+    return decode_chunk_bytes(content)[0]
 
-def find_chunks_simple(template_chunks_path, variable_name):
+def find_chunks_simple(template_chunks_path, variable_name, chunk_index=None):
 
-    excluded_folders = {
-        'Banners_Include_Set1', 'Banners_Include_Set2', 'CM_Edits', 'CM_Manipulation', 
-        'CM_Metadata', 'ES_Metadata', 'ES_OnNextCase', 'IA_Lists', 'IA_Metadata', 
-        'IA_OnNextCase', 'LinkDBManipulation', 'LinkDBMetadata', 'TEMP_eVal_CreateSPSS', 
-        'Trim_Edits', 'Trim_Manipulation', 'Trim_Metadata'
-    }
-    
     existing_chunks = []
     
     try:
-        all_folders = [f for f in os.listdir(template_chunks_path) 
-                      if os.path.isdir(os.path.join(template_chunks_path, f)) 
-                      and f not in excluded_folders]
+        if chunk_index is None:
+            chunk_index = chunk_index_registry.get_index(template_chunks_path)
         
-        logger.info(f"📁 Scanning {len(all_folders)} folders for variable: {variable_name}")
+        found_folders = set()
         
-        for folder in all_folders:
-            folder_path = os.path.join(template_chunks_path, folder)
+        for location in chunk_index.lookup(variable_name):
+            folder = location["folder"]
+            if folder in found_folders:
+                continue
+            
+            file_path = location["file_path"]
             
             try:
-                all_files = [f for f in os.listdir(folder_path) if f.endswith('.mrs')]
                 
-                for filename in all_files:
-                    file_basename = os.path.splitext(filename)[0]
+                real_content = chunk_content_cache.read_text(file_path)
+                
+                if real_content.strip():
+                    existing_chunks.append({
+                        "folder": folder,
+                        "path": f"outputs-dimensions-content\\Template_Chunks\\{folder}",
+                        "fileName": location["fileName"],
+                        "fileExt": "mrs",
+                        "content": real_content,
+                        "file_path": file_path
+                    })
+                    found_folders.add(folder)
+                    logger.info(f"✅ Found chunk: {folder}/{location['fileName']}.mrs")
                     
-                    if file_basename.lower() == variable_name.lower():
-                        file_path = os.path.join(folder_path, filename)
-                        
-                        try:
-                            
-                            real_content = read_file_with_encoding_simple(file_path)
-                            
-                            if real_content.strip():
-                                existing_chunks.append({
-                                    "folder": folder,
-                                    "path": f"outputs-dimensions-content\\Template_Chunks\\{folder}",
-                                    "fileName": file_basename,
-                                    "fileExt": "mrs",
-                                    "content": real_content,
-                                    "file_path": file_path
-                                })
-                                logger.info(f"✅ Found chunk: {folder}/{filename}")
-                                break
-                                
-                        except Exception as e:
-                            logger.error(f"❌ Error reading {file_path}: {str(e)}")
-                            continue
-                            
             except Exception as e:
-                logger.warning(f"⚠️ Could not scan folder {folder}: {str(e)}")
+                logger.error(f"❌ Error reading {file_path}: {str(e)}")
                 continue
         
         return existing_chunks
@@ -1873,41 +2408,15 @@ def find_chunks_simple(template_chunks_path, variable_name):
         logger.error(f"💥 Error scanning folders: {str(e)}")
         return []
 
-def find_next_question_simple(lines, start_index):
-
-    for i in range(start_index + 1, len(lines)):
-        if lines[i].strip().startswith('*QUESTION'):
-            return i
-    return -1
-
 def generate_structure_simple(existing_chunks, variable_name):
 
-    if not existing_chunks:
-        return ""
-    
-    structure = f"**{variable_name}\n** Notes:\n**\t- Data processor..: CHUNKS"
-    
-    for chunk in existing_chunks:
-        structure += "\n**\t                    kap_output_chunk_start"
-        structure += f"\n**\t                    path:{chunk['path']}"
-        structure += f"\n**\t                    fileName:{chunk['fileName']}"
-        structure += f"\n**\t                    fileExt:{chunk['fileExt']}"
-        structure += "\n**\t                    'content:David"
-        
-        
-        content_lines = chunk['content'].split('\n')
-        for content_line in content_lines:
-            structure += f"\n**\t                    {content_line}"
-        
-        structure += "\n**\t                    kap_output_chunk_end"
-        structure += "\n**\t                    "
-    
-    return structure
+    return chunk_block_renderer.render_structure(existing_chunks, variable_name)
 
 @app.post("/odin-chunks/process-file")
 async def process_odin_simple(
     odin_file: UploadFile = File(..., description="ODIN file to process"),
-    workspace_path: str = Form(..., description="Workspace path")
+    workspace_path: str = Form(..., description="Workspace path"),
+    incremental: bool = Form(False, description="Update existing chunk blocks instead of inserting new ones")
 ):
 
     try:
@@ -1936,23 +2445,10 @@ async def process_odin_simple(
         lines = file_content.split('\n')
         
         
-        dimvar_entries = []
-        for i, line in enumerate(lines):
-            dimvar_match = re.search(r'DIMVAR=([^;"\s]+)', line)
-            
-            if dimvar_match:
-                variable_name = dimvar_match.group(1)
-                
-                if variable_name.endswith('.slice'):
-                    variable_name = variable_name.replace('.slice', '')
-                
-                dimvar_entries.append({
-                    "line_index": i,
-                    "variable_name": variable_name,
-                    "original_line": line.strip()
-                })
+        odin_structure, cached = odin_structure_cache.get(content_bytes, lines)
+        dimvar_entries = odin_structure.dimvar_entries()
         
-        logger.info(f"🔍 Found {len(dimvar_entries)} DIMVAR entries")
+        logger.info(f"🔍 Found {len(dimvar_entries)} DIMVAR entries{' (cached scan)' if cached else ''}")
         
         
         template_chunks_path = os.path.join(workspace_path, "outputs-dimensions-content", "Template_Chunks")
@@ -1960,28 +2456,75 @@ async def process_odin_simple(
         if not os.path.exists(template_chunks_path):
             raise HTTPException(status_code=404, detail="Template_Chunks folder not found")
         
+        chunk_index = chunk_index_registry.get_index(template_chunks_path)
         
-        processed_lines = lines.copy()
+        
+        question_index = odin_structure.question_index
+        insertions = {}
+        removals = {}
         total_insertions = 0
         processing_results = []
+        incremental_stats = {"updated": 0, "unchanged": 0, "removed": 0}
+        previous_structures = odin_structure.structures_by_question() if incremental else {}
         
         for dimvar in reversed(dimvar_entries):
             variable_name = dimvar["variable_name"]
             line_index = dimvar["line_index"]
             
+            # DIMVAR= text inside an already inserted chunk is chunk content, not a variable to process
+            if incremental and dimvar["in_chunk_structure"]:
+                continue
+            
             logger.info(f"🔧 Processing variable: {variable_name}")
             
-            existing_chunks = find_chunks_simple(template_chunks_path, variable_name)
+            existing_chunks = find_chunks_simple(template_chunks_path, variable_name, chunk_index)
+            next_question_line = question_index.next_after(line_index)
+            
+            previous = previous_structures.pop((variable_name, next_question_line), [])
+            kept = previous[0] if previous and existing_chunks else None
+            
+            for stale in previous:
+                if stale is not kept:
+                    removals[stale["start_line"]] = stale["end_line"] + 1
+                    incremental_stats["removed"] += 1
             
             if existing_chunks:
                 logger.info(f"✅ Found {len(existing_chunks)} chunks for {variable_name}")
                 
-                next_question_line = find_next_question_simple(processed_lines, line_index)
+                if kept is not None:
+                    current_signature = [
+                        (chunk["path"], chunk["fileName"], chunk_content_cache.read(chunk["file_path"]).sha1)
+                        for chunk in existing_chunks
+                    ]
+                    
+                    if current_signature == odin_structure.structure_signature(kept):
+                        incremental_stats["unchanged"] += 1
+                        processing_results.append({
+                            "variable_name": variable_name,
+                            "line_index": line_index,
+                            "chunks_found": len(existing_chunks),
+                            "existing_files": [f"{chunk['folder']}/{chunk['fileName']}.mrs" for chunk in existing_chunks],
+                            "status": "UNCHANGED - chunks up to date"
+                        })
+                    else:
+                        chunk_structure = generate_structure_simple(existing_chunks, variable_name)
+                        insertions.setdefault(kept["start_line"], []).append(chunk_structure)
+                        removals[kept["start_line"]] = kept["end_line"] + 1
+                        
+                        incremental_stats["updated"] += 1
+                        processing_results.append({
+                            "variable_name": variable_name,
+                            "line_index": line_index,
+                            "chunks_found": len(existing_chunks),
+                            "existing_files": [f"{chunk['folder']}/{chunk['fileName']}.mrs" for chunk in existing_chunks],
+                            "status": "UPDATED - chunks replaced"
+                        })
+                        
+                        logger.info(f"🔄 Replaced chunks for {variable_name}")
                 
-                if next_question_line != -1:
+                elif next_question_line != -1:
                     chunk_structure = generate_structure_simple(existing_chunks, variable_name)
-                    structure_lines = chunk_structure.split('\n')
-                    processed_lines[next_question_line:next_question_line] = structure_lines
+                    insertions.setdefault(next_question_line, []).append(chunk_structure)
                     
                     total_insertions += 1
                     processing_results.append({
@@ -2010,7 +2553,10 @@ async def process_odin_simple(
                 logger.warning(f"❌ No files found for {variable_name}")
         
         
-        processed_content = '\n'.join(processed_lines)
+        if incremental and not insertions and not removals:
+            processed_content = file_content
+        else:
+            processed_content = ''.join(iter_rewritten_segments(lines, insertions, removals))
         
         
         if original_was_utf16:
@@ -2037,7 +2583,8 @@ async def process_odin_simple(
                         "insertions_made": total_insertions,
                         "skipped_no_files": len([r for r in processing_results if r["chunks_found"] == 0]),
                         "original_size": len(content_bytes),
-                        "processed_size": len(processed_content_utf16)
+                        "processed_size": len(processed_content_utf16),
+                        **({"incremental": incremental_stats} if incremental else {})
                     },
                     "processing_results": processing_results
                 }
@@ -2061,7 +2608,8 @@ async def process_odin_simple(
                 "insertions_made": total_insertions,
                 "skipped_no_files": len([r for r in processing_results if r["chunks_found"] == 0]),
                 "original_size": len(content_bytes),
-                "processed_size": len(processed_content)
+                "processed_size": len(processed_content),
+                **({"incremental": incremental_stats} if incremental else {})
             },
             "processing_results": processing_results
         }
@@ -2072,10 +2620,16 @@ async def process_odin_simple(
         logger.error(f"💥 Error processing ODIN file: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to process ODIN file: {str(e)}")
 
-@app.get("/odin-chunks/scan-chunks")
-async def scan_chunks_simple(workspace_path: str, variable_name: str):
+@app.post("/odin-chunks/preview")
+async def preview_odin_file(
+    odin_file: UploadFile = File(..., description="ODIN file to preview"),
+    workspace_path: str = Form(..., description="Workspace path")
+):
 
     try:
+        if not odin_file.filename or not odin_file.filename.endswith('.odin'):
+            raise HTTPException(status_code=400, detail="File must have .odin extension")
+        
         if not workspace_path or not os.path.exists(workspace_path):
             raise HTTPException(status_code=400, detail="Invalid workspace path")
         
@@ -2084,14 +2638,396 @@ async def scan_chunks_simple(workspace_path: str, variable_name: str):
         if not os.path.exists(template_chunks_path):
             raise HTTPException(status_code=404, detail="Template_Chunks folder not found")
         
-        chunks = find_chunks_simple(template_chunks_path, variable_name)
+        content_bytes = await odin_file.read()
+        file_content, encoding_label = decode_odin_bytes(content_bytes)
+        lines = file_content.split('\n')
         
-        return {
-            "success": True,
-            "variable_name": variable_name,
-            "chunks": chunks,
-            "total_chunks": len(chunks),
-            "template_chunks_path": template_chunks_path
+        odin_structure, cached = odin_structure_cache.get(content_bytes, lines)
+        chunk_index = chunk_index_registry.get_index(template_chunks_path)
+        
+        planned = []
+        
+        for dimvar in odin_structure.dimvar_entries():
+            variable_name = dimvar["variable_name"]
+            existing_chunks = find_chunks_simple(template_chunks_path, variable_name, chunk_index)
+            next_question_line = odin_structure.question_index.next_after(dimvar["line_index"])
+            
+            if not existing_chunks:
+                status = "SKIPPED - no .mrs files found"
+            elif next_question_line == -1:
+                status = "ERROR - no next QUESTION found"
+            else:
+                status = "WOULD INSERT"
+            
+            planned.append({
+                "variable_name": variable_name,
+                "line_index": dimvar["line_index"],
+                "insert_before_line": next_question_line if next_question_line != -1 else None,
+                "chunks_found": len(existing_chunks),
+                "existing_files": [f"{chunk['folder']}/{chunk['fileName']}.mrs" for chunk in existing_chunks],
+                "status": status
+            })
+        
+        return {
+            "success": True,
+            "dry_run": True,
+            "original_filename": odin_file.filename,
+            "encoding": encoding_label,
+            "cached_scan": cached,
+            "structure": odin_structure.describe(),
+            "existing_chunk_structures": [
+                {
+                    "variable_name": structure["variable_name"],
+                    "start_line": structure["start_line"],
+                    "end_line": structure["end_line"],
+                    "chunk_files": [
+                        f"{odin_structure.chunk_blocks[b].get('path', '')}\\{odin_structure.chunk_blocks[b].get('fileName', '')}"
+                        for b in structure["blocks"]
+                    ]
+                }
+                for structure in odin_structure.structures
+            ],
+            "planned_insertions": planned,
+            "stats": {
+                "dimvar_count": len(planned),
+                "would_insert": len([p for p in planned if p["status"] == "WOULD INSERT"]),
+                "skipped_no_files": len([p for p in planned if p["chunks_found"] == 0])
+            }
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"💥 Error previewing ODIN file: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to preview ODIN file: {str(e)}")
+
+@app.post("/odin-chunks/process-file/stream")
+async def process_odin_stream(
+    odin_file: UploadFile = File(..., description="ODIN file to process"),
+    workspace_path: str = Form(..., description="Workspace path")
+):
+
+    logger.info(f"🚀 Streaming ODIN file: {odin_file.filename}")
+    
+    if not odin_file.filename or not odin_file.filename.endswith('.odin'):
+        raise HTTPException(status_code=400, detail="File must have .odin extension")
+    
+    if not workspace_path or not os.path.exists(workspace_path):
+        raise HTTPException(status_code=400, detail="Invalid workspace path")
+    
+    template_chunks_path = os.path.join(workspace_path, "outputs-dimensions-content", "Template_Chunks")
+    
+    if not os.path.exists(template_chunks_path):
+        raise HTTPException(status_code=404, detail="Template_Chunks folder not found")
+    
+    try:
+        chunk_index = chunk_index_registry.get_index(template_chunks_path)
+        
+        source = odin_file.file
+        source.seek(0, os.SEEK_END)
+        original_size = source.tell()
+        source.seek(0)
+        
+        codec, bom, encoding_label = detect_odin_encoding(source.read(4))
+        source.seek(0)
+    except Exception as e:
+        logger.error(f"💥 Error preparing ODIN stream: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to process ODIN file: {str(e)}")
+    
+    summary_id = uuid.uuid4().hex
+    summary = {
+        "summary_id": summary_id,
+        "status": "running",
+        "original_filename": odin_file.filename,
+        "encoding_info": {
+            "original_encoding": encoding_label,
+            "output_encoding": encoding_label
+        },
+        "started_at": datetime.now().isoformat()
+    }
+    odin_stream_summaries.put(summary_id, summary)
+    
+    rewriter = OdinStreamRewriter(
+        lambda variable_name: find_chunks_simple(template_chunks_path, variable_name, chunk_index),
+        lambda chunks, variable_name: generate_structure_simple(chunks, variable_name)
+    )
+    
+    def odin_stream():
+        processed_size = 0
+        
+        try:
+            for block in iter_odin_stream(source, rewriter, codec, bom):
+                processed_size += len(block)
+                yield block
+            
+            processing_results = rewriter.finish()
+            summary.update({
+                "status": "completed",
+                "success": True,
+                "message": f"✅ Processed {rewriter.dimvar_count} DIMVAR entries, inserted {rewriter.insertions} chunks",
+                "stats": {
+                    "dimvar_count": rewriter.dimvar_count,
+                    "insertions_made": rewriter.insertions,
+                    "skipped_no_files": len([r for r in processing_results if r["chunks_found"] == 0]),
+                    "original_size": original_size,
+                    "processed_size": processed_size
+                },
+                "processing_results": processing_results,
+                "completed_at": datetime.now().isoformat()
+            })
+            logger.info(f"✅ Streamed {odin_file.filename}: {rewriter.dimvar_count} DIMVARs, {rewriter.insertions} insertions")
+            
+        except Exception as e:
+            summary.update({
+                "status": "failed",
+                "success": False,
+                "error": str(e),
+                "completed_at": datetime.now().isoformat()
+            })
+            logger.error(f"💥 Error streaming ODIN file: {str(e)}")
+            raise
+    
+    return StreamingResponse(
+        odin_stream(),
+        media_type="application/octet-stream",
+        headers={
+            "Content-Disposition": f'attachment; filename="{os.path.basename(odin_file.filename)}"',
+            "X-Odin-Summary-Id": summary_id,
+            "X-Odin-Encoding": encoding_label,
+            "X-Odin-Original-Size": str(original_size)
+        }
+    )
+
+@app.get("/odin-chunks/process-file/stream/{summary_id}")
+async def get_odin_stream_summary(summary_id: str):
+
+    summary = odin_stream_summaries.get(summary_id)
+    
+    if summary is None:
+        raise HTTPException(status_code=404, detail=f"No ODIN stream summary for {summary_id}")
+    
+    return summary
+
+def collect_odin_files(source_dir: str) -> List[str]:
+
+    odin_files = []
+    
+    for root, dirs, names in os.walk(source_dir):
+        dirs.sort()
+        for file_name in sorted(names):
+            if file_name.endswith('.odin') and not file_name.endswith(f"{ODIN_BATCH_SUFFIX}.odin"):
+                odin_files.append(os.path.relpath(os.path.join(root, file_name), source_dir))
+    
+    return odin_files
+
+def extract_odin_zip(zip_path: str, destination: str) -> List[str]:
+
+    extracted = []
+    root = os.path.realpath(destination)
+    
+    with zipfile.ZipFile(zip_path) as archive:
+        for member in archive.infolist():
+            name = member.filename.replace('\\', '/')
+            
+            if member.is_dir() or not name.endswith('.odin'):
+                continue
+            
+            # Drive-qualified names (D:/x.odin) join to drive-relative paths on Windows
+            if name.startswith('/') or '..' in name.split('/') or ntpath.splitdrive(name)[0]:
+                logger.warning(f"⚠️ Skipping unsafe zip entry: {member.filename}")
+                continue
+            
+            target = os.path.join(destination, *name.split('/'))
+            if os.path.commonpath([root, os.path.realpath(target)]) != root:
+                logger.warning(f"⚠️ Skipping unsafe zip entry: {member.filename}")
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            
+            with archive.open(member) as src, open(target, 'wb') as dst:
+                shutil.copyfileobj(src, dst, UPLOAD_CHUNK_SIZE)
+            
+            extracted.append(os.path.relpath(target, destination))
+    
+    return sorted(extracted)
+
+def batch_output_path(relative_path: str, output_root: str) -> str:
+
+    stem, ext = os.path.splitext(relative_path)
+    return os.path.join(output_root, f"{stem}{ODIN_BATCH_SUFFIX}{ext}")
+
+def discard_odin_batch_work_dir(executor: ThreadPoolExecutor, work_dir: str):
+
+    # Files that were already running when a request was cancelled still write under work_dir
+    executor.shutdown(wait=True)
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+@app.post("/odin-chunks/process-batch")
+async def process_odin_batch(
+    workspace_path: str = Form(..., description="Workspace path"),
+    source_path: Optional[str] = Form(None, description="Directory of .odin files to process"),
+    odin_zip: Optional[UploadFile] = File(None, description="Zip archive of .odin files"),
+    output_mode: str = Form("side_by_side", description="side_by_side or zip"),
+    max_workers: int = Form(4, description="Files processed in parallel")
+):
+
+    work_dir = None
+    executor = None
+    
+    try:
+        logger.info(f"🚀 Batch ODIN processing: {source_path or (odin_zip.filename if odin_zip else None)}")
+        
+        if not workspace_path or not os.path.exists(workspace_path):
+            raise HTTPException(status_code=400, detail="Invalid workspace path")
+        
+        if bool(source_path) == bool(odin_zip):
+            raise HTTPException(status_code=400, detail="Provide either source_path or odin_zip")
+        
+        if output_mode not in ODIN_BATCH_OUTPUT_MODES:
+            raise HTTPException(status_code=400, detail=f"output_mode must be one of {', '.join(ODIN_BATCH_OUTPUT_MODES)}")
+        
+        if source_path and not os.path.isdir(source_path):
+            raise HTTPException(status_code=400, detail=f"Source directory not found: {source_path}")
+        
+        if odin_zip and not (odin_zip.filename or '').lower().endswith('.zip'):
+            raise HTTPException(status_code=400, detail="odin_zip must be a .zip file")
+        
+        template_chunks_path = os.path.join(workspace_path, "outputs-dimensions-content", "Template_Chunks")
+        
+        if not os.path.exists(template_chunks_path):
+            raise HTTPException(status_code=404, detail="Template_Chunks folder not found")
+        
+        loop = asyncio.get_running_loop()
+        chunk_index = await loop.run_in_executor(None, chunk_index_registry.get_index, template_chunks_path)
+        
+        # Uploaded archives have no server-side folder to write next to, so they always come back as a zip
+        if odin_zip:
+            output_mode = "zip"
+        
+        work_dir = tempfile.mkdtemp(prefix="odin_batch_")
+        
+        if odin_zip:
+            input_root = os.path.join(work_dir, "input")
+            zip_path = os.path.join(work_dir, "upload.zip")
+            await stream_upload_to_file(odin_zip, zip_path)
+            
+            try:
+                relative_files = await loop.run_in_executor(None, extract_odin_zip, zip_path, input_root)
+            except zipfile.BadZipFile:
+                raise HTTPException(status_code=400, detail="odin_zip is not a valid zip archive")
+        else:
+            input_root = source_path
+            relative_files = await loop.run_in_executor(None, collect_odin_files, input_root)
+        
+        if not relative_files:
+            raise HTTPException(status_code=400, detail="No .odin files found")
+        
+        output_root = input_root if output_mode == "side_by_side" else os.path.join(work_dir, "output")
+        
+        logger.info(f"🔍 Processing {len(relative_files)} ODIN files ({output_mode})")
+        
+        def process_one(relative_path):
+            destination = batch_output_path(relative_path, output_root)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            
+            return rewrite_odin_file(
+                os.path.join(input_root, relative_path),
+                destination,
+                lambda variable_name: find_chunks_simple(template_chunks_path, variable_name, chunk_index),
+                generate_structure_simple
+            )
+        
+        report = OdinBatchReport()
+        workers = max(1, min(max_workers, MAX_BATCH_PARALLELISM))
+        
+        # Never shut the pool down with wait=True here: that would block the event loop until every
+        # queued file finished, even after the client has gone away
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="odin-batch")
+        try:
+            futures = [loop.run_in_executor(executor, process_one, rel) for rel in relative_files]
+            outcomes = await asyncio.gather(*futures, return_exceptions=True)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        for relative_path, outcome in zip(relative_files, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"❌ Failed to process {relative_path}: {str(outcome)}")
+                report.add_error(relative_path, str(outcome))
+            else:
+                report.add_file(relative_path, outcome)
+        
+        summary = report.describe()
+        totals = summary["totals"]
+        message = f"✅ Processed {totals['processed']}/{totals['files']} ODIN files, inserted {totals['insertions_made']} chunks"
+        logger.info(message)
+        
+        if output_mode == "zip":
+            result_zip = os.path.join(work_dir, "odin_batch_result.zip")
+            
+            def build_result_zip():
+                with zipfile.ZipFile(result_zip, 'w', zipfile.ZIP_DEFLATED) as archive:
+                    for entry in summary["files"]:
+                        if "error" not in entry:
+                            output_file = batch_output_path(entry["file"], output_root)
+                            archive.write(output_file, os.path.relpath(output_file, output_root))
+                    archive.writestr(ODIN_BATCH_REPORT_NAME, json.dumps(summary, indent=2, ensure_ascii=False))
+            
+            await loop.run_in_executor(None, build_result_zip)
+            
+            cleanup_dir = work_dir
+            work_dir = None
+            
+            return FileResponse(
+                result_zip,
+                media_type="application/zip",
+                filename="odin_batch_result.zip",
+                headers={
+                    "X-Odin-Batch-Files": str(totals["files"]),
+                    "X-Odin-Batch-Failed": str(totals["failed"]),
+                    "X-Odin-Batch-Insertions": str(totals["insertions_made"])
+                },
+                background=BackgroundTask(shutil.rmtree, cleanup_dir, ignore_errors=True)
+            )
+        
+        return {
+            "success": totals["failed"] == 0,
+            "message": message,
+            "output_mode": output_mode,
+            "output_root": output_root,
+            "report": summary
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"💥 Batch ODIN error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Batch ODIN processing failed: {str(e)}")
+    finally:
+        if work_dir and os.path.exists(work_dir):
+            if executor is not None:
+                asyncio.get_running_loop().run_in_executor(None, discard_odin_batch_work_dir, executor, work_dir)
+            else:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+@app.get("/odin-chunks/scan-chunks")
+async def scan_chunks_simple(workspace_path: str, variable_name: str):
+
+    try:
+        if not workspace_path or not os.path.exists(workspace_path):
+            raise HTTPException(status_code=400, detail="Invalid workspace path")
+        
+        template_chunks_path = os.path.join(workspace_path, "outputs-dimensions-content", "Template_Chunks")
+        
+        if not os.path.exists(template_chunks_path):
+            raise HTTPException(status_code=404, detail="Template_Chunks folder not found")
+        
+        chunks = find_chunks_simple(template_chunks_path, variable_name)
+        
+        return {
+            "success": True,
+            "variable_name": variable_name,
+            "chunks": chunks,
+            "total_chunks": len(chunks),
+            "template_chunks_path": template_chunks_path
         }
         
     except HTTPException:
@@ -2131,6 +3067,50 @@ async def debug_variable_simple(workspace_path: str, variable_name: str):
     except Exception as e:
         return {"error": f"Debug failed: {str(e)}"}
 
+@app.get("/odin-chunks/index")
+async def get_chunk_index_status(workspace_path: Optional[str] = None, refresh: bool = False):
+
+    try:
+        if workspace_path:
+            template_chunks_path = os.path.join(workspace_path, "outputs-dimensions-content", "Template_Chunks")
+            
+            if not os.path.exists(template_chunks_path):
+                raise HTTPException(status_code=404, detail="Template_Chunks folder not found")
+            
+            if refresh:
+                chunk_index_registry.invalidate(template_chunks_path)
+            
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, chunk_index_registry.get_index, template_chunks_path)
+        
+        return {
+            "success": True,
+            "index": chunk_index_registry.describe(),
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"💥 Chunk index error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Chunk index failed: {str(e)}")
+
+@app.get("/odin-chunks/cache-stats")
+async def get_chunk_cache_stats(clear: bool = False):
+
+    if clear:
+        chunk_content_cache.clear()
+        logger.info("🧹 Chunk content cache cleared")
+    
+    return {
+        "success": True,
+        "content_cache": chunk_content_cache.describe(),
+        "structure_cache": odin_structure_cache.describe(),
+        "render_cache": chunk_block_renderer.describe(),
+        "index": chunk_index_registry.describe(),
+        "timestamp": datetime.now().isoformat()
+    }
+
 @app.get("/odin-chunks/test")
 async def test_odin_simple():
 
@@ -2141,8 +3121,14 @@ async def test_odin_simple():
         "encoding": "UTF-16/UTF-8 detection",
         "endpoints": [
             "/odin-chunks/process-file",
+            "/odin-chunks/preview",
+            "/odin-chunks/process-file/stream",
+            "/odin-chunks/process-file/stream/{summary_id}",
+            "/odin-chunks/process-batch",
             "/odin-chunks/scan-chunks",
             "/odin-chunks/debug-variable",
+            "/odin-chunks/index",
+            "/odin-chunks/cache-stats",
             "/odin-chunks/test"
         ],
         "timestamp": datetime.now().isoformat()
@@ -2269,57 +3255,36 @@ def save_exclusions_to_workspace(workspace_path: str, exclusions: List[str]) ->
 
 
 
-def read_chunk_db_xml(workspace_path: str) -> List[str]:
+def read_chunk_db_xml(workspace_path: str) -> FrozenSet[str]:
 
-    xml_path = os.path.join(workspace_path, "outputs-dimensions-content", 
-                           "Template_Configuration", "CHUNK_DB.XML")
+    chunk_db = chunk_db_registry.get_index(workspace_path)
     
-    if not os.path.exists(xml_path):
+    if chunk_db is None:
         raise HTTPException(status_code=404, detail="CHUNK_DB.XML not found")
     
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
-    
-    
-    data = []
-    for namechunk in root.iter("NAME"):
-        data.append(namechunk.text)
-    
-    my_set = set(data)
-    my_new_array = list(my_set)
-    my_new_array = list(map(str.upper, my_new_array))
-    
-    return my_new_array
+    return chunk_db.names
 
 
 
 
 
-def download_product_json(token: str, product_name: str, workspace_path: str) -> Dict[str, Any]:
+async def download_product_json(token: str, product_name: str, workspace_path: str,
+                                version: str = "", force_refresh: bool = False) -> Dict[str, Any]:
 
     product_name = product_name.strip().capitalize()
-    url = (f"https://sandbox3-kap-product-template.azurewebsites.net/api/producttemplate/product/"
-           f"{product_name}?languages=en-gb&refreshCache=true&version=")
-    
-    collection_id = "11433564-0587479e-07c6-4f16-95c9-6b7c59da0523"
-    headers = {"x-jetstream-devtoken": token}
     
     try:
-        response = requests.get(url.format(id=collection_id), headers=headers, verify=False)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+        json_data, cache_info = await product_template_cache.get(
+            token, product_name, workspace_path, version=version.strip(), force_refresh=force_refresh
+        )
+    except ProductTemplateError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
     
-    if response.status_code == 200:
-        json_data = response.json()
-        
-        json_path = os.path.join(workspace_path, f"{product_name}.json")
-        with open(json_path, "w", encoding='utf-8') as file:
-            json.dump(json_data, file, indent=4)
+    if cache_info["workspace_json_written"]:
         print(f"\n                JSON file success save.                \n")
-        return json_data
-    else:
-        error_msg = f"Failed to download Postman Collection (Verify Product Name Exists). HTTP status code: {response.status_code}"
-        raise HTTPException(status_code=response.status_code, detail=error_msg)
+    print(f"📦 Product template source: {cache_info['source']} (sha256 {cache_info['sha256'][:12]})")
+    
+    return json_data
 
 
 
@@ -2330,24 +3295,9 @@ def extract_variables_from_modules(json_data: Dict[str, Any], items_to_exclude:
     variable_found = ""
     
     try:
+        exclusions = ExclusionMatcher(items_to_exclude)
         
-        variable = ""
-        for link in json_data["modules"]:
-            for links in link["questions"]:
-                if links.get("contentType") != "Script":
-                    if links.get("contentType") != "InfoQuestion":
-                        if links.get("answers") or links.get("columns"):
-                            group_name = links.get("groupName")
-                            if group_name:
-                                variable += group_name + ","
-        
-        
-        variable = variable[:-1]  
-        array = variable.split(",")
-        array = list(map(str.upper, array))
-        
-        
-        array = [items for items in array if items not in items_to_exclude]
+        array = [name for name in extract_group_names(json_data) if not exclusions.is_excluded(name)]
         
         return array, variable_found
         
@@ -2359,74 +3309,43 @@ def extract_variables_from_modules(json_data: Dict[str, Any], items_to_exclude:
 
 
 
-def create_mrs_files_with_labels(new_variables: List[str], workspace_path: str, json_data: Dict[str, Any]) -> int:
+def create_mrs_files_with_labels(new_variables: List[str], workspace_path: str, json_data: Dict[str, Any],
+                                question_index: Optional[ProductQuestionIndex] = None) -> int:
 
+    if question_index is None:
+        question_index = ProductQuestionIndex(json_data)
     
     project_folder = os.path.join(workspace_path, "MDD_Manipulation_Include")
     
-    if os.path.exists(project_folder):
-        shutil.rmtree(project_folder)
-    
-    os.mkdir(project_folder)
-    
-    chunks_created = 0
+    stats = mrs_staging_writer.write(
+        project_folder,
+        new_variables,
+        lambda element: generate_labels_for_variable(element.capitalize(), json_data, question_index),
+        lambda element: f"' Error generating labels for: {element}\n' Basic content fallback\n{element}.Response.Value"
+    )
     
-    for element in new_variables:
-        if not element:  
-            continue
-        
-        
-        element_cap = element.capitalize()
-        
-        
-        file_name = f"{element_cap}.mrs"
-        file_path = os.path.join(project_folder, file_name)
-        
-        
-        labels = generate_labels_for_variable(element_cap, json_data)
-        
-        
-        try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(labels)
-            
-            chunks_created += 1
-            print(f"Created chunk file with labels: {file_name}")
-            
-        except Exception as e:
-            print(f"Error creating file {file_name}: {str(e)}")
-            
-            try:
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(f"' Error generating labels for: {element}\n' Basic content fallback\n{element}.Response.Value")
-                chunks_created += 1
-            except:
-                pass
+    print(f"Created chunk files with labels: {stats['written']} written, {stats['unchanged']} unchanged, {stats['failed']} failed")
     
-    return chunks_created
+    return stats["files_created"]
 
-def generate_labels_for_variable(element_cap: str, json_data: Dict[str, Any]) -> str:
+def generate_labels_for_variable(element_cap: str, json_data: Dict[str, Any],
+                                question_index: Optional[ProductQuestionIndex] = None) -> str:
 
     labels = ""
     
     try:
+        if question_index is None:
+            question_index = ProductQuestionIndex(json_data)
         
-        for link in json_data["modules"]:
-            for links in link["questions"]:
-                if links.get("contentType") != "Script":
-                    if links.get("contentType") != "InfoQuestion":
-                        if links.get("contentType") != "LeftRightSliderQuestion":
-                            if links.get("groupName") == element_cap:
-                                
-                                
-                                if links.get("answers"):
-                                    labels += generate_title_text(links.get("groupName"))
-                                    labels += generate_answer_labels(links, "answers")
-                                
-                                
-                                elif links.get("columns"):
-                                    labels += generate_title_text(links.get("groupName"))
-                                    labels += generate_column_labels(links)
+        for links in question_index.questions_for(element_cap):
+            
+            if links.get("answers"):
+                labels += generate_title_text(links.get("groupName"))
+                labels += generate_answer_labels(links, "answers")
+            
+            elif links.get("columns"):
+                labels += generate_title_text(links.get("groupName"))
+                labels += generate_column_labels(links)
         
         return labels
         
@@ -2448,109 +3367,73 @@ def generate_title_text(group_name: str) -> str:
         + "\n"
     )
 
+def collect_label_texts(links: Dict[str, Any], field_type: str) -> List[Tuple[Any, str]]:
+
+    return [
+        (answ.get("code"), text.get("text", ""))
+        for answ in links[field_type] if answ.get("text")
+        for text in answ["text"]
+    ]
+
 def generate_answer_labels(links: Dict[str, Any], field_type: str) -> str:
 
-    labels = ""
-    
-    for answ in links[field_type]:
-        if answ.get("text"):
-            for text in answ["text"]:
-                clean_text = clean_label_text(text.get("text", ""))
-                
-                labels += (
-                    'sbSetResponseText(MDM,"'
-                    + links.get("groupName")
-                    + '","Analysis",LOCALE,"_'
-                    + str(answ.get("code"))
-                    + '","'
-                    + clean_text
-                    + '")'
-                    + "\n"
-                )
-    
+    entries = collect_label_texts(links, field_type)
+    cleaned = clean_label_texts([text for _, text in entries])
+    group_name = links.get("groupName")
     
-    return labels.replace("_997", "NA").replace("_998", "REF").replace("_999", "DK")
+    return "".join(
+        'sbSetResponseText(MDM,"'
+        + group_name
+        + '","Analysis",LOCALE,"'
+        + response_code_label(code)
+        + '","'
+        + clean_text
+        + '")'
+        + "\n"
+        for (code, _), clean_text in zip(entries, cleaned)
+    )
 
 def generate_column_labels(links: Dict[str, Any]) -> str:
 
-    labels = ""
+    entries = collect_label_texts(links, "columns")
+    cleaned = clean_label_texts([text for _, text in entries])
+    group_name = links.get("groupName")
     
-    for answ in links["columns"]:
-        if answ.get("text"):
-            for text in answ["text"]:
-                clean_text = clean_label_text(text.get("text", ""))
-                
-                labels += (
-                    'sbSetResponseText(MDM,"'
-                    + links.get("groupName")
-                    + "[..].slice"
-                    + '","Analysis",LOCALE,"_'
-                    + str(answ.get("code"))
-                    + '","'
-                    + clean_text
-                    + '")'
-                    + "\n"
-                )
-    
-    return labels
-
-def clean_label_text(text: str) -> str:
-
-    return (
-        text.replace("\u039d", "")
-        .replace("[b]", "")
-        .replace("[/b]", "")
-        .replace("[i]", "")
-        .replace("[/i]", "")
-        .replace("[u]", "")
-        .replace("[/u]", "")
-        .replace("&amp;", "&")
-        .replace("&lt;", "<")
-        .replace("&gt;", ">")
-        .replace("&quot;", '"')
-        .replace("&#39;", "'")
+    return "".join(
+        'sbSetResponseText(MDM,"'
+        + group_name
+        + "[..].slice"
+        + '","Analysis",LOCALE,"_'
+        + str(code)
+        + '","'
+        + clean_text
+        + '")'
+        + "\n"
+        for (code, _), clean_text in zip(entries, cleaned)
     )
 
 
 
 
 
-def process_variables_and_create_chunks(json_data: Dict[str, Any], existing_chunks: List[str], 
-                                      workspace_path: str, items_to_exclude: List[str]) -> Dict[str, Any]:
+def diff_product_variables(json_data: Dict[str, Any], existing_chunks: FrozenSet[str],
+                           items_to_exclude: List[str]) -> Tuple[List[str], List[str], List[str]]:
 
-    
     variables_array, variable_found = extract_variables_from_modules(json_data, items_to_exclude)
     
+    existing_variables, new_variables = diff_variables(variables_array, frozenset(existing_chunks))
     
-    new_elements = ""
-    variables_found_existing = ""
-    
-    for num in variables_array:
-        found = False
-        for element in existing_chunks:
-            if element == num:
-                found = True
-                break
-        
-        if found:
-            variables_found_existing += f"found {num}\n"
-        else:
-            new_elements += num + ","
-    
-    
-    new_elements = new_elements[:-1]  
-    new_variables = new_elements.split(",") if new_elements else []
-    
-    
-    chunks_created = create_mrs_files_with_labels(new_variables, workspace_path, json_data)
-    
-    
-    analysis_results = {
+    return variables_array, existing_variables, new_variables
+
+def build_analysis_results(variables_array: List[str], existing_variables: List[str],
+                           new_variables: List[str], chunks_created: int) -> Dict[str, Any]:
+
+    return {
         "variables_processed": variables_array,
-        "existing_variables": variables_found_existing.split('\n') if variables_found_existing else [],
+        "existing_variables": existing_variables,
         "new_variables": new_variables,
         "chunks_created": chunks_created,
-        "existing_chunks_found": len([v for v in variables_found_existing.split('\n') if v.strip()]),
+        "existing_chunks_found": len(existing_variables),
         "new_chunks_created": len(new_variables),
         "type_distribution": {
             "CATEGORICAL": len(new_variables),
@@ -2560,8 +3443,21 @@ def process_variables_and_create_chunks(json_data: Dict[str, Any], existing_chun
             "UNKNOWN": 0
         }
     }
+
+def process_variables_and_create_chunks(json_data: Dict[str, Any], existing_chunks: FrozenSet[str], 
+                                      workspace_path: str, items_to_exclude: List[str],
+                                      question_index: Optional[ProductQuestionIndex] = None) -> Dict[str, Any]:
+
     
-    return analysis_results
+    variables_array, existing_variables, new_variables = diff_product_variables(
+        json_data, existing_chunks, items_to_exclude
+    )
+    
+    
+    chunks_created = create_mrs_files_with_labels(new_variables, workspace_path, json_data, question_index)
+    
+    
+    return build_analysis_results(variables_array, existing_variables, new_variables, chunks_created)
 
 
 
@@ -2602,8 +3498,7 @@ def generate_original_style_report(product_name: str, analysis_results: Dict[str
     
     
     for existing in analysis_results['existing_variables']:
-        if existing.strip():
-            report_lines.append(f"✓ {existing}")
+        report_lines.append(f"✓ found {existing}")
     
     report_lines.extend([
         "",
@@ -2639,15 +3534,16 @@ def generate_original_style_report(product_name: str, analysis_results: Dict[str
 
 
 
-@app.post("/product-chunks/process")
-async def process_product_chunks_exact_original(
-    token: str = Form(..., description="Azure API token"),
-    product_name: str = Form(..., description="Product name"),
-    workspace_path: str = Form(..., description="Workspace path")
-) -> ProductChunksResponse:
+async def run_product_chunks_pipeline(token: str, product_name: str, workspace_path: str,
+                                     version: str = "", force_refresh: bool = False,
+                                     on_stage=None) -> ProductChunksResponse:
 
-    try:
-        
+    def stage(name, status, detail=None):
+        if on_stage:
+            on_stage(name, status, detail)
+    
+    # Runs for one workspace are serialized so two pipelines never swap MDD_Manipulation_Include at once
+    async with product_chunks_workspace_locks.hold(workspace_key(workspace_path)):
         if not os.path.exists(workspace_path):
             raise HTTPException(status_code=400, detail="Workspace path does not exist")
         
@@ -2655,27 +3551,53 @@ async def process_product_chunks_exact_original(
         if not os.path.exists(outputs_path):
             raise HTTPException(status_code=400, detail="outputs-dimensions-content folder not found")
         
+        if not os.path.exists(get_chunk_db_path(workspace_path)):
+            raise HTTPException(status_code=404, detail="CHUNK_DB.XML not found")
+        
         print(f"🔍 Processing product: {product_name}")
         print(f"📂 Workspace: {workspace_path}")
         
+        loop = asyncio.get_running_loop()
+        
         
         items_to_exclude = load_exclusions_from_workspace(workspace_path)
         print(f"📋 Loaded {len(items_to_exclude)} exclusion items from workspace")
         
         
-        existing_chunks = read_chunk_db_xml(workspace_path)
+        stage("download", "running")
+        print(f"⬇️ Downloading JSON for product: {product_name}")
+        json_data = await download_product_json(token, product_name, workspace_path, version, force_refresh)
+        stage("download", "completed")
+        
+        
+        stage("index", "running")
+        existing_chunks = await loop.run_in_executor(None, read_chunk_db_xml, workspace_path)
         print(f"📋 Found {len(existing_chunks)} existing chunks in CHUNK_DB.XML")
+        question_index = await loop.run_in_executor(None, ProductQuestionIndex, json_data)
+        print(f"📋 Indexed {question_index.question_count} questions into {len(question_index.by_group)} groups")
+        stage("index", "completed", {"chunk_db_names": len(existing_chunks), "questions": question_index.question_count})
         
         
-        print(f"⬇️ Downloading JSON for product: {product_name}")
-        json_data = download_product_json(token, product_name, workspace_path)
+        stage("diff", "running")
+        variables_array, existing_variables, new_variables = await loop.run_in_executor(
+            None, diff_product_variables, json_data, existing_chunks, items_to_exclude
+        )
+        stage("diff", "completed", {
+            "variables": len(variables_array),
+            "existing": len(existing_variables),
+            "new": len(new_variables)
+        })
         
         
-        analysis_results = process_variables_and_create_chunks(
-            json_data, existing_chunks, workspace_path, items_to_exclude
+        stage("write", "running")
+        chunks_created = await loop.run_in_executor(
+            None, create_mrs_files_with_labels, new_variables, workspace_path, json_data, question_index
         )
+        analysis_results = build_analysis_results(variables_array, existing_variables, new_variables, chunks_created)
+        stage("write", "completed", {"files_created": chunks_created})
         
         
+        stage("report", "running")
         report_content = generate_original_style_report(product_name, analysis_results, items_to_exclude)
         
         
@@ -2683,6 +3605,7 @@ async def process_product_chunks_exact_original(
         report_path = os.path.join(workspace_path, report_filename)
         with open(report_path, 'w', encoding='utf-8') as f:
             f.write(report_content)
+        stage("report", "completed", {"report_file": report_filename})
         
         print(f"📄 Report saved: {report_filename}")
         print(f"📁 MRS files created in: MDD_Manipulation_Include/")
@@ -2699,6 +3622,18 @@ async def process_product_chunks_exact_original(
             new_chunks_created=analysis_results['new_chunks_created'],
             existing_chunks_found=analysis_results['existing_chunks_found']
         )
+
+@app.post("/product-chunks/process")
+async def process_product_chunks_exact_original(
+    token: str = Form(..., description="Azure API token"),
+    product_name: str = Form(..., description="Product name"),
+    workspace_path: str = Form(..., description="Workspace path"),
+    version: str = Form("", description="Product template version (latest when empty)"),
+    force_refresh: bool = Form(False, description="Bypass the local product template cache")
+) -> ProductChunksResponse:
+
+    try:
+        return await run_product_chunks_pipeline(token, product_name, workspace_path, version, force_refresh)
         
     except HTTPException:
         raise
@@ -2706,6 +3641,80 @@ async def process_product_chunks_exact_original(
         print(f"❌ An error occurred: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
 
+@app.post("/product-chunks/jobs")
+async def create_product_chunks_job(
+    token: str = Form(..., description="Azure API token"),
+    product_name: str = Form(..., description="Product name"),
+    workspace_path: str = Form(..., description="Workspace path"),
+    version: str = Form("", description="Product template version (latest when empty)"),
+    force_refresh: bool = Form(False, description="Bypass the local product template cache")
+):
+
+    if not os.path.exists(workspace_path):
+        raise HTTPException(status_code=400, detail="Workspace path does not exist")
+    
+    active_job = product_chunks_jobs.active_for(workspace_path)
+    if active_job:
+        raise HTTPException(status_code=409, detail=f"Job {active_job.id} is still {active_job.status} for this workspace")
+    
+    async def runner(job):
+        response = await run_product_chunks_pipeline(
+            token, product_name, workspace_path, version, force_refresh, on_stage=job.stage
+        )
+        return response.dict()
+    
+    job = product_chunks_jobs.submit(runner, {
+        "product_name": product_name,
+        "workspace_path": workspace_path,
+        "version": version,
+        "force_refresh": force_refresh
+    })
+    
+    print(f"🧵 Product chunks job {job.id} started for {product_name}")
+    
+    return {
+        "success": True,
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/product-chunks/jobs/{job.id}",
+        "stages": list(job.stages)
+    }
+
+@app.get("/product-chunks/jobs")
+async def list_product_chunks_jobs():
+
+    return {
+        "success": True,
+        "jobs": product_chunks_jobs.describe()
+    }
+
+@app.get("/product-chunks/jobs/{job_id}")
+async def get_product_chunks_job(job_id: str):
+
+    job = product_chunks_jobs.get(job_id)
+    
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    
+    return job.describe()
+
+@app.post("/product-chunks/jobs/{job_id}/cancel")
+async def cancel_product_chunks_job(job_id: str):
+
+    job = product_chunks_jobs.get(job_id)
+    
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    
+    cancelled = product_chunks_jobs.cancel(job_id)
+    
+    return {
+        "success": cancelled,
+        "job_id": job_id,
+        "status": job.status,
+        "message": "Cancellation requested; the job stops when its current stage finishes" if cancelled else f"Job already {job.status}"
+    }
+
 @app.get("/product-chunks/exclusions")
 async def get_exclusions(workspace_path: str) -> ExclusionsResponse:
 
@@ -2801,6 +3810,48 @@ async def reset_exclusions_to_default(workspace_path: str = Form(...)) -> Exclus
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to reset exclusions: {str(e)}")
 
+@app.get("/product-chunks/chunk-db")
+async def get_chunk_db_index(workspace_path: str, names: Optional[str] = None, refresh: bool = False):
+
+    try:
+        if not os.path.exists(workspace_path):
+            raise HTTPException(status_code=400, detail="Workspace path does not exist")
+        
+        if refresh:
+            chunk_db_registry.invalidate(workspace_path)
+        
+        loop = asyncio.get_running_loop()
+        chunk_db = await loop.run_in_executor(None, chunk_db_registry.get_index, workspace_path)
+        
+        if chunk_db is None:
+            raise HTTPException(status_code=404, detail="CHUNK_DB.XML not found")
+        
+        requested = [name.strip() for name in (names or "").split(',') if name.strip()]
+        
+        return {
+            "success": True,
+            "index": chunk_db.describe(),
+            "lookup": chunk_db.lookup(requested),
+            "registry": chunk_db_registry.describe(),
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to read CHUNK_DB.XML: {str(e)}")
+
+@app.on_event("shutdown")
+async def close_product_template_session():
+
+    await product_template_cache.close()
+
+@app.on_event("shutdown")
+async def shutdown_git_service():
+
+    if git_service:
+        git_service.shutdown()
+
 @app.get("/product-chunks/test")
 async def test_product_chunks_exact_original():
 
@@ -2819,11 +3870,16 @@ async def test_product_chunks_exact_original():
         ],
         "endpoints": [
             "/product-chunks/process",
+            "/product-chunks/jobs",
+            "/product-chunks/jobs/{job_id}",
+            "/product-chunks/jobs/{job_id}/cancel",
             "/product-chunks/exclusions",
             "/product-chunks/exclusions/update", 
             "/product-chunks/exclusions/reset",
+            "/product-chunks/chunk-db",
             "/product-chunks/test"
         ],
+        "template_cache": product_template_cache.describe(),
         "timestamp": datetime.now().isoformat()
     }
 
@@ -1,9 +1,19 @@
 import os
+import json
+import shlex
+import shutil
+import signal
+import stat
 import subprocess
 import asyncio
+import functools
+import threading
+import time
 import git
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import configparser
 from datetime import datetime
 from pydantic import BaseModel
@@ -81,9 +91,464 @@ class FileDiff(BaseModel):
 
 
 
+COMMIT_GRAPH_FILE = "kaptools_commit_graph.json"
+BRANCH_EXCLUDE_PATTERNS = ['HEAD', 'develop', 'release', 'main', 'master']
+
+DEFAULT_FETCH_INTERVAL_SECONDS = 300
+FETCH_SCHEDULER_TICK_SECONDS = 30
+
+GIT_OPERATION_WORKERS = 4
+REPO_POOL_MAX_IDLE = 2
+REPO_POOL_IDLE_SECONDS = 600
+DEFAULT_REPO_TIMEOUT_SECONDS = 120
+FRESH_FETCH_TIMEOUT_SHARE = 0.5
+DEFAULT_CLONE_TIMEOUT_SECONDS = 1800
+
+COMPARISON_MODES = ("numstat", "patch")
+NAME_STATUS_CHANGE_TYPES = {"A": "added", "D": "deleted", "R": "renamed"}
+
+# One record per remote ref; the message body may span lines, so records end with \x1e
+REMOTE_REF_FORMAT = "%00".join([
+    "%(refname)",
+    "%(objectname)",
+    "%(committerdate:iso-strict)",
+    "%(authorname)",
+    "%(authoremail:trim)",
+    "%(contents)"
+]) + "%1e"
+
+
+class RemoteRefInfo:
+
+    def __init__(self, name: str, sha: str, date: datetime, author: str, author_email: str, message: str):
+        self.name = name
+        self.sha = sha
+        self.date = date
+        self.author = author
+        self.author_email = author_email
+        self.message = message
+
+def list_remote_refs(repo: git.Repo, remote: str = "origin") -> List[RemoteRefInfo]:
+
+    output = repo.git.for_each_ref(
+        "--sort=-committerdate",
+        f"--format={REMOTE_REF_FORMAT}",
+        f"refs/remotes/{remote}"
+    )
+
+    refs = []
+    for record in output.split("\x1e"):
+        record = record.lstrip("\n")
+        if not record:
+            continue
+
+        fields = record.split("\x00")
+        if len(fields) != 6 or not fields[1]:
+            continue
+
+        refname, sha, date, author, author_email, message = fields
+        refs.append(RemoteRefInfo(
+            name=refname[len("refs/remotes/"):],
+            sha=sha,
+            date=datetime.fromisoformat(date),
+            author=author,
+            author_email=author_email,
+            message=message
+        ))
+
+    return refs
+
+class CommitGraphCache:
+
+    def __init__(self):
+        self._graphs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def ahead_behind(self, repo: git.Repo, base_sha: str, refs: List[RemoteRefInfo],
+                     live_shas: Optional[set] = None) -> Dict[str, Tuple[int, int]]:
+
+        git_dir = repo.git_dir
+        graph = self._load(git_dir)
+
+        with self._lock:
+            if graph["base"] != base_sha:
+                graph = {"base": base_sha, "refs": {}}
+                self._graphs[git_dir] = graph
+            entries = graph["refs"]
+            missing = [ref.sha for ref in refs if ref.sha not in entries]
+            self.hits += len(refs) - len(missing)
+            self.misses += len(missing)
+
+        computed = {}
+        for sha in dict.fromkeys(missing):
+            try:
+                computed[sha] = self._compute(repo, base_sha, sha)
+            except Exception as e:
+                print(f"Warning: Could not calculate ahead/behind for {sha[:8]}: {e}")
+
+        with self._lock:
+            entries.update(computed)
+            if live_shas is not None:
+                for sha in [sha for sha in entries if sha not in live_shas]:
+                    del entries[sha]
+            result = {ref.sha: (entries[ref.sha]["ahead"], entries[ref.sha]["behind"])
+                      for ref in refs if ref.sha in entries}
+            snapshot = json.dumps(graph) if computed else None
+
+        if snapshot:
+            self._save(git_dir, snapshot)
+
+        return result
+
+    def _compute(self, repo: git.Repo, base_sha: str, sha: str) -> Dict[str, Any]:
+
+        behind, ahead = repo.git.rev_list("--left-right", "--count", f"{base_sha}...{sha}").split()
+
+        try:
+            merge_base = repo.git.merge_base(base_sha, sha).strip() or None
+        except git.GitCommandError:
+            merge_base = None
+
+        return {"merge_base": merge_base, "ahead": int(ahead), "behind": int(behind)}
+
+    def _load(self, git_dir: str) -> Dict[str, Any]:
+
+        with self._lock:
+            graph = self._graphs.get(git_dir)
+            if graph is not None:
+                return graph
+
+        graph = {"base": None, "refs": {}}
+        path = os.path.join(git_dir, COMMIT_GRAPH_FILE)
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+                if isinstance(stored.get("refs"), dict):
+                    graph = {"base": stored.get("base"), "refs": stored["refs"]}
+            except Exception as e:
+                print(f"Warning: Ignoring unreadable commit graph cache {path}: {e}")
+
+        with self._lock:
+            return self._graphs.setdefault(git_dir, graph)
+
+    def _save(self, git_dir: str, snapshot: str):
+
+        path = os.path.join(git_dir, COMMIT_GRAPH_FILE)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(snapshot)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not persist commit graph cache {path}: {e}")
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
+    def describe(self) -> Dict[str, Any]:
+
+        with self._lock:
+            return {
+                "repositories": len(self._graphs),
+                "cached_refs": sum(len(graph["refs"]) for graph in self._graphs.values()),
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+class PooledRepo:
+
+    def __init__(self, repo: git.Repo, signature: Optional[Tuple[int, ...]]):
+        self.repo = repo
+        self.signature = signature
+        self.last_used = time.monotonic()
+
+class RepoPool:
+
+    def __init__(self, max_idle_per_repo: int = REPO_POOL_MAX_IDLE, idle_seconds: float = REPO_POOL_IDLE_SECONDS):
+        self.max_idle_per_repo = max_idle_per_repo
+        self.idle_seconds = idle_seconds
+        self._idle: Dict[str, List[PooledRepo]] = {}
+        self._signatures: Dict[str, Optional[Tuple[int, ...]]] = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+    @contextmanager
+    def borrow(self, repo_path: str):
+
+        repo_path = os.path.abspath(repo_path)
+        entry = self._acquire(repo_path)
+        try:
+            yield entry.repo
+        except BaseException:
+            # The handle's cat-file helpers may be mid-stream; never hand it out again
+            self._close(entry)
+            raise
+        else:
+            self._release(repo_path, entry)
+
+    def _signature(self, repo_path: str) -> Optional[Tuple[int, ...]]:
+
+        # A re-cloned repository gets a new .git inode; worktree pointers are files that change in place
+        try:
+            stat = os.stat(os.path.join(repo_path, ".git"))
+        except OSError:
+            return None
+
+        if os.path.isdir(os.path.join(repo_path, ".git")):
+            return (stat.st_dev, stat.st_ino)
+        return (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+
+    def _acquire(self, repo_path: str) -> PooledRepo:
+
+        signature = self._signature(repo_path)
+        stale = []
+        entry = None
+
+        with self._lock:
+            idle = self._idle.setdefault(repo_path, [])
+            if self._signatures.get(repo_path) != signature:
+                stale.extend(idle)
+                idle.clear()
+                self._signatures[repo_path] = signature
+
+            now = time.monotonic()
+            while idle:
+                candidate = idle.pop()
+                if now - candidate.last_used > self.idle_seconds:
+                    stale.append(candidate)
+                else:
+                    entry = candidate
+                    break
+
+        for old in stale:
+            self._close(old)
+
+        if entry is not None:
+            if os.path.isdir(entry.repo.git_dir):
+                with self._lock:
+                    self.reused += 1
+                return entry
+            self._close(entry)
+
+        entry = PooledRepo(git.Repo(repo_path), signature)
+        with self._lock:
+            self.created += 1
+        return entry
+
+    def _release(self, repo_path: str, entry: PooledRepo):
+
+        with self._lock:
+            idle = self._idle.setdefault(repo_path, [])
+            keep = (
+                entry.signature is not None
+                and entry.signature == self._signatures.get(repo_path)
+                and len(idle) < self.max_idle_per_repo
+            )
+            if keep:
+                entry.last_used = time.monotonic()
+                idle.append(entry)
+
+        if not keep:
+            self._close(entry)
+
+    def _close(self, entry: PooledRepo):
+
+        with self._lock:
+            self.discarded += 1
+
+        try:
+            entry.repo.close()
+        except Exception as e:
+            print(f"Warning: Could not close repository handle {entry.repo.git_dir}: {e}")
+
+    def close_all(self):
+
+        with self._lock:
+            entries = [entry for idle in self._idle.values() for entry in idle]
+            self._idle.clear()
+
+        for entry in entries:
+            self._close(entry)
+
+    def describe(self) -> Dict[str, Any]:
+
+        with self._lock:
+            return {
+                "repositories": len(self._idle),
+                "idle_handles": sum(len(idle) for idle in self._idle.values()),
+                "created": self.created,
+                "reused": self.reused,
+                "discarded": self.discarded
+            }
+
+class RepoFetchState:
+
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        self.last_fetched: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.in_flight: Optional[Future] = None
+        self.fetches = 0
+        self.coalesced = 0
+
+    def fetched_at(self) -> Optional[datetime]:
+
+        # FETCH_HEAD also reflects fetches made outside the app
+        try:
+            external = datetime.fromtimestamp(os.stat(os.path.join(self.repo_path, ".git", "FETCH_HEAD")).st_mtime)
+        except OSError:
+            external = None
+
+        if self.last_fetched and external:
+            return max(self.last_fetched, external)
+        return self.last_fetched or external
+
+class FetchScheduler:
+
+    def __init__(self, interval_seconds: float = DEFAULT_FETCH_INTERVAL_SECONDS, max_workers: int = 2,
+                 repo_pool: Optional[RepoPool] = None):
+        self.interval_seconds = interval_seconds
+        self.repo_pool = repo_pool or RepoPool()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="git-fetch")
+        self._states: Dict[str, RepoFetchState] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def request_fetch(self, repo_path: str) -> Future:
+
+        with self._lock:
+            state = self._state(repo_path)
+            if state.in_flight and not state.in_flight.done():
+                state.coalesced += 1
+                return state.in_flight
+
+            state.in_flight = self.executor.submit(self._run_fetch, state)
+            return state.in_flight
+
+    def fetch(self, repo_path: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+
+        self.request_fetch(repo_path).result(timeout)
+        return self.status(repo_path)
+
+    def ensure_fresh(self, repo_path: str):
+
+        self.register(repo_path)
+        if self.is_stale(repo_path):
+            self.request_fetch(repo_path)
+
+    def register(self, repo_path: str):
+
+        with self._lock:
+            self._state(repo_path)
+            if self.interval_seconds > 0 and self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="git-fetch-scheduler", daemon=True)
+                self._thread.start()
+
+    def is_stale(self, repo_path: str) -> bool:
+
+        with self._lock:
+            state = self._state(repo_path)
+
+        fetched_at = state.fetched_at()
+        if fetched_at is None:
+            return True
+        return self.interval_seconds > 0 and (datetime.now() - fetched_at).total_seconds() > self.interval_seconds
+
+    def status(self, repo_path: str) -> Dict[str, Any]:
+
+        with self._lock:
+            state = self._state(repo_path)
+            fetching = bool(state.in_flight and not state.in_flight.done())
+
+        fetched_at = state.fetched_at()
+        age = (datetime.now() - fetched_at).total_seconds() if fetched_at else None
+
+        return {
+            "last_fetched": fetched_at.isoformat() if fetched_at else None,
+            "age_seconds": round(age, 1) if age is not None else None,
+            "stale": self.is_stale(repo_path),
+            "fetching": fetching,
+            "last_error": state.last_error,
+            "interval_seconds": self.interval_seconds
+        }
+
+    def shutdown(self):
+
+        self._stop.set()
+        self.executor.shutdown(wait=False)
+
+    def _state(self, repo_path: str) -> RepoFetchState:
+
+        repo_path = os.path.abspath(repo_path)
+        state = self._states.get(repo_path)
+        if state is None:
+            state = self._states[repo_path] = RepoFetchState(repo_path)
+        return state
+
+    def _run_fetch(self, state: RepoFetchState):
+
+        try:
+            with self.repo_pool.borrow(state.repo_path) as repo:
+                repo.remotes.origin.fetch()
+        except Exception as e:
+            state.last_error = str(e)
+            print(f"Warning: Could not fetch from origin for {state.repo_path}: {e}")
+            raise
+
+        state.last_fetched = datetime.now()
+        state.last_error = None
+        state.fetches += 1
+
+    def _loop(self):
+
+        while not self._stop.wait(min(self.interval_seconds, FETCH_SCHEDULER_TICK_SECONDS)):
+            with self._lock:
+                repo_paths = list(self._states)
+
+            for repo_path in repo_paths:
+                if self.is_stale(repo_path):
+                    self.request_fetch(repo_path)
+
+    def describe(self) -> Dict[str, Any]:
+
+        with self._lock:
+            states = list(self._states.values())
+
+        return {
+            "interval_seconds": self.interval_seconds,
+            "repositories": {
+                state.repo_path: {
+                    "fetches": state.fetches,
+                    "coalesced": state.coalesced,
+                    **self.status(state.repo_path)
+                }
+                for state in states
+            }
+        }
+
+
+
+
+
 class GitService:
     def __init__(self):
         self.config = self._load_config()
+        self.commit_graph = CommitGraphCache()
+        self.repo_pool = RepoPool()
+        self.fetch_scheduler = FetchScheduler(
+            self.config.getfloat('Git', 'fetch_interval_seconds', fallback=DEFAULT_FETCH_INTERVAL_SECONDS),
+            repo_pool=self.repo_pool
+        )
+        self.repo_timeout_seconds = self.config.getfloat('Git', 'repo_timeout_seconds', fallback=DEFAULT_REPO_TIMEOUT_SECONDS)
+        self.clone_timeout_seconds = self.config.getfloat('Git', 'clone_timeout_seconds', fallback=DEFAULT_CLONE_TIMEOUT_SECONDS)
+        self.executor = ThreadPoolExecutor(max_workers=GIT_OPERATION_WORKERS, thread_name_prefix="git-ops")
     
     def _load_config(self) -> configparser.ConfigParser:
 
@@ -111,6 +576,35 @@ class GitService:
     
     
     
+    def shutdown(self):
+
+        self.fetch_scheduler.shutdown()
+        self.executor.shutdown(wait=False)
+        self.repo_pool.close_all()
+
+    async def run_in_pool(self, func, *args, **kwargs):
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def _with_repo_timeout(self, awaitable, timeout: Optional[float] = None):
+
+        return await asyncio.wait_for(awaitable, timeout or self.repo_timeout_seconds)
+
+    async def _run_per_repo(self, repos: List[Tuple[str, str]], func, *args) -> List[Any]:
+
+        # Results keep the order of repos; failures and timeouts come back as exceptions
+        return await asyncio.gather(*[
+            self._with_repo_timeout(self.run_in_pool(func, repo_type, repo_path, *args))
+            for repo_type, repo_path in repos
+        ], return_exceptions=True)
+
+    def _describe_error(self, error: BaseException) -> str:
+
+        if isinstance(error, asyncio.TimeoutError):
+            return f"timed out after {self.repo_timeout_seconds:g}s"
+        return str(error)
+
     async def clone_microservices(self, project_path: str, branch: str = "develop") -> Dict[str, any]:
 
         try:
@@ -141,58 +635,7 @@ class GitService:
                 }
             ]
             
-            results = []
-            
-            for repo in repos:
-                
-                if repo["path"].exists():
-                    results.append({
-                        "repo": repo["name"],
-                        "status": "skipped",
-                        "message": f"Repository {repo['name']} already exists"
-                    })
-                    continue
-                
-                
-                clone_command = self.config.get('Git', repo["url_key"], fallback='')
-                if not clone_command:
-                    results.append({
-                        "repo": repo["name"],
-                        "status": "error", 
-                        "message": f"Clone command not found for {repo['name']}"
-                    })
-                    continue
-                
-                
-                try:
-                    process = await asyncio.create_subprocess_shell(
-                        f'cd "{workspace}" && {clone_command}',
-                        stdout=asyncio.subprocess.PIPE,
-                        stderr=asyncio.subprocess.PIPE
-                    )
-                    
-                    stdout, stderr = await process.communicate()
-                    
-                    if process.returncode == 0:
-                        results.append({
-                            "repo": repo["name"],
-                            "status": "success",
-                            "message": f"Successfully cloned {repo['name']}"
-                        })
-                    else:
-                        error_msg = stderr.decode() if stderr else "Unknown error"
-                        results.append({
-                            "repo": repo["name"],
-                            "status": "error",
-                            "message": f"Failed to clone {repo['name']}: {error_msg}"
-                        })
-                        
-                except Exception as e:
-                    results.append({
-                        "repo": repo["name"],
-                        "status": "error",
-                        "message": f"Exception cloning {repo['name']}: {str(e)}"
-                    })
+            results = await asyncio.gather(*[self._clone_repository(workspace, repo) for repo in repos])
             
             
             successful_repos = [r for r in results if r["status"] in ["success", "skipped"]]
@@ -214,6 +657,111 @@ class GitService:
                 "workspace": project_path,
                 "results": []
             }
+
+    async def _clone_repository(self, workspace: Path, repo: Dict[str, any]) -> Dict[str, str]:
+
+        if repo["path"].exists():
+            return {
+                "repo": repo["name"],
+                "status": "skipped",
+                "message": f"Repository {repo['name']} already exists"
+            }
+        
+        
+        clone_command = self.config.get('Git', repo["url_key"], fallback='')
+        if not clone_command:
+            return {
+                "repo": repo["name"],
+                "status": "error", 
+                "message": f"Clone command not found for {repo['name']}"
+            }
+        
+        
+        try:
+            # Exec rather than a shell so a timeout kills git itself, not just cmd.exe / sh
+            process = await asyncio.create_subprocess_exec(
+                *shlex.split(clone_command),
+                cwd=str(workspace),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=os.name != 'nt'
+            )
+            
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), self.clone_timeout_seconds)
+            except asyncio.TimeoutError:
+                await self._kill_process_tree(process)
+                
+                message = f"Failed to clone {repo['name']}: timed out after {self.clone_timeout_seconds:g}s"
+                cleanup_error = self._remove_partial_clone(repo["path"])
+                if cleanup_error:
+                    message += f"; partial clone left at {repo['path']} ({cleanup_error}), delete it before retrying"
+                
+                return {
+                    "repo": repo["name"],
+                    "status": "error",
+                    "message": message
+                }
+            
+            if process.returncode == 0:
+                return {
+                    "repo": repo["name"],
+                    "status": "success",
+                    "message": f"Successfully cloned {repo['name']}"
+                }
+            else:
+                error_msg = stderr.decode() if stderr else "Unknown error"
+                return {
+                    "repo": repo["name"],
+                    "status": "error",
+                    "message": f"Failed to clone {repo['name']}: {error_msg}"
+                }
+                
+        except Exception as e:
+            return {
+                "repo": repo["name"],
+                "status": "error",
+                "message": f"Exception cloning {repo['name']}: {str(e)}"
+            }
+    
+    async def _kill_process_tree(self, process: asyncio.subprocess.Process):
+
+        # git clone runs helpers such as git-remote-https that outlive a plain kill of the parent
+        try:
+            if os.name == 'nt':
+                killer = await asyncio.create_subprocess_exec(
+                    'taskkill', '/T', '/F', '/PID', str(process.pid),
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.DEVNULL
+                )
+                await killer.wait()
+            else:
+                os.killpg(process.pid, signal.SIGKILL)
+        except (OSError, ProcessLookupError) as e:
+            print(f"Warning: Could not kill clone process tree {process.pid}: {e}")
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+        
+        await process.wait()
+
+    def _remove_partial_clone(self, path: Path) -> Optional[str]:
+
+        if not path.exists():
+            return None
+
+        def make_writable(func, target, _):
+            # Pack files are read-only on Windows
+            os.chmod(target, stat.S_IWRITE)
+            func(target)
+
+        try:
+            shutil.rmtree(path, onerror=make_writable)
+            return None
+        except OSError as e:
+            print(f"Warning: Could not remove partial clone {path}: {e}")
+            return str(e)
     
     def validate_workspace(self, workspace_path: str) -> Dict[str, any]:
 
@@ -361,9 +909,7 @@ class GitService:
     
     
 
-    def get_recent_branches(self, project_path: str, repo_name: str = "both", limit: int = 15) -> List[BranchInfo]:
-
-        branches = []
+    def _git_repositories(self, project_path: str, repo_name: str = "both") -> List[Tuple[str, str]]:
 
         repos_to_check = []
 
@@ -378,107 +924,43 @@ class GitService:
             if os.path.exists(dimensions_path) and os.path.exists(os.path.join(dimensions_path, ".git")):
                 repos_to_check.append(('dimensions', dimensions_path))
 
-        for repo_type, repo_path in repos_to_check:
-            try:
-                repo = git.Repo(repo_path)
-
-                
-                try:
-                    repo.remotes.origin.fetch()
-                except Exception as e:
-                    print(f"Warning: Could not fetch from origin for {repo_type}: {e}")
-
-                
-                exclude_patterns = ['HEAD', 'develop', 'release', 'main', 'master']
-                remote_refs = []
-
-                try:
-                    for ref in repo.remotes.origin.refs:
-                        branch_name = ref.name
-                        display_name = branch_name.replace('origin/', '')
+        return repos_to_check
 
-                        
-                        if not any(pattern.lower() in display_name.lower() for pattern in exclude_patterns):
-                            remote_refs.append(ref)
-                except Exception as e:
-                    print(f"Error getting remote refs for {repo_type}: {e}")
-                    continue
-                
-                
-                try:
-                    remote_refs.sort(key=lambda x: x.commit.committed_datetime, reverse=True)
-                except Exception as e:
-                    print(f"Warning: Could not sort branches for {repo_type}: {e}")
+    def _refresh_remote(self, repo_path: str, fresh: bool, label: str):
 
-                
-                current_branch = None
-                try:
-                    current_branch = repo.active_branch.name
-                except:
-                    try:
-                        current_branch = repo.head.ref.name if repo.head.ref else None
-                    except:
-                        current_branch = None
+        if not fresh:
+            self.fetch_scheduler.ensure_fresh(repo_path)
+            return
 
-                
-                for ref in remote_refs[:limit]:
-                    try:
-                        display_name = ref.name.replace('origin/', '')
+        # Bounded so a hung remote cannot pin a git-ops worker; half the budget is left for reading local refs
+        timeout = self.repo_timeout_seconds * FRESH_FETCH_TIMEOUT_SHARE
+        try:
+            self.fetch_scheduler.fetch(repo_path, timeout=timeout)
+        except FutureTimeoutError:
+            print(f"Warning: Fetch for {label} still running after {timeout:g}s; serving local refs")
+        except Exception as e:
+            print(f"Warning: Could not fetch from origin for {label}: {e}")
 
-                        
-                        commits_ahead = 0
-                        commits_behind = 0
+    def get_fetch_status(self, project_path: str, repo_name: str = "both") -> Dict[str, Dict[str, Any]]:
 
-                        try:
-                            if hasattr(repo.remotes.origin.refs, 'master'):
-                                master_ref = repo.remotes.origin.refs.master
-                                commits_behind = len(list(repo.iter_commits(f'{ref.commit}..{master_ref.commit}')))
-                                commits_ahead = len(list(repo.iter_commits(f'{master_ref.commit}..{ref.commit}')))
-                        except Exception as e:
-                            print(f"Warning: Could not calculate ahead/behind for {display_name}: {e}")
+        return {
+            repo_type: self.fetch_scheduler.status(repo_path)
+            for repo_type, repo_path in self._git_repositories(project_path, repo_name)
+        }
 
-                        
-                        commit_message = ""
-                        try:
-                            commit_message = ref.commit.message.strip()
-                            if commit_message:
-                                commit_message = commit_message.split('\n')[0][:100]
-                            else:
-                                commit_message = "No commit message"
-                        except:
-                            commit_message = "Error reading commit message"
+    async def get_recent_branches(self, project_path: str, repo_name: str = "both", limit: int = 15,
+                                  fresh: bool = False) -> List[BranchInfo]:
 
-                        
-                        author_name = "Unknown"
-                        author_email = "unknown@unknown.com"
-                        try:
-                            author_name = ref.commit.author.name or "Unknown"
-                            author_email = ref.commit.author.email or "unknown@unknown.com"
-                        except:
-                            pass
-                        
-                        branch_info = BranchInfo(
-                            name=ref.name,
-                            display_name=display_name,
-                            author=author_name,
-                            author_email=author_email,
-                            commit_hash=ref.commit.hexsha[:8],
-                            commit_message=commit_message,
-                            date=ref.commit.committed_datetime,
-                            repository=repo_type,
-                            is_current=(display_name == current_branch),
-                            commits_ahead=commits_ahead,
-                            commits_behind=commits_behind
-                        )
-                        branches.append(branch_info)
+        branches = []
 
-                    except Exception as e:
-                        print(f"Error processing branch {ref.name}: {e}")
-                        continue
+        repos_to_check = self._git_repositories(project_path, repo_name)
+        results = await self._run_per_repo(repos_to_check, self._recent_branches_for_repo, limit, fresh)
 
-            except Exception as e:
-                print(f"Error processing {repo_type} repository: {e}")
+        for (repo_type, _), result in zip(repos_to_check, results):
+            if isinstance(result, Exception):
+                print(f"Error processing {repo_type} repository: {self._describe_error(result)}")
                 continue
+            branches.extend(result)
             
         
         try:
@@ -488,33 +970,102 @@ class GitService:
 
         return branches
 
-    def checkout_branch(self, project_path: str, repo_name: str, branch_name: str) -> CheckoutResult:
+    def _recent_branches_for_repo(self, repo_type: str, repo_path: str, limit: int, fresh: bool) -> List[BranchInfo]:
 
-        try:
-            
-            repo_folder_map = {
-                'content': 'outputs-dimensions-content',
-                'dimensions': 'outputs-dimensions'
-            }
+        branches = []
 
-            if repo_name not in repo_folder_map:
-                return CheckoutResult(
-                    success=False,
-                    message=f"Invalid repository name: {repo_name}. Must be 'content' or 'dimensions'",
-                    current_branch="",
-                    repository=repo_name
-                )
+        self._refresh_remote(repo_path, fresh, repo_type)
+        with self.repo_pool.borrow(repo_path) as repo:
 
-            repo_folder = repo_folder_map[repo_name]
-            repo_path = os.path.join(project_path, repo_folder)
+            
+            try:
+                all_refs = list_remote_refs(repo)
+            except Exception as e:
+                print(f"Error getting remote refs for {repo_type}: {e}")
+                return []
 
-            if not os.path.exists(repo_path):
-                return CheckoutResult(
-                    success=False,
-                    message=f"Repository {repo_folder} not found in workspace: {repo_path}",
-                    current_branch="",
-                    repository=repo_name
-                )
+            master_sha = next((ref.sha for ref in all_refs if ref.name == 'origin/master'), None)
+            remote_refs = [
+                ref for ref in all_refs
+                if not any(pattern.lower() in ref.name.replace('origin/', '').lower() for pattern in BRANCH_EXCLUDE_PATTERNS)
+            ][:limit]
+
+            
+            current_branch = None
+            try:
+                current_branch = repo.active_branch.name
+            except:
+                try:
+                    current_branch = repo.head.ref.name if repo.head.ref else None
+                except:
+                    current_branch = None
+
+            
+            counts = {}
+            if master_sha:
+                counts = self.commit_graph.ahead_behind(
+                    repo, master_sha, remote_refs, live_shas={ref.sha for ref in all_refs}
+                )
+
+            for ref in remote_refs:
+                try:
+                    display_name = ref.name.replace('origin/', '')
+                    commits_ahead, commits_behind = counts.get(ref.sha, (0, 0))
+
+                    commit_message = ref.message.strip()
+                    if commit_message:
+                        commit_message = commit_message.split('\n')[0][:100]
+                    else:
+                        commit_message = "No commit message"
+
+                    branch_info = BranchInfo(
+                        name=ref.name,
+                        display_name=display_name,
+                        author=ref.author or "Unknown",
+                        author_email=ref.author_email or "unknown@unknown.com",
+                        commit_hash=ref.sha[:8],
+                        commit_message=commit_message,
+                        date=ref.date,
+                        repository=repo_type,
+                        is_current=(display_name == current_branch),
+                        commits_ahead=commits_ahead,
+                        commits_behind=commits_behind
+                    )
+                    branches.append(branch_info)
+
+                except Exception as e:
+                    print(f"Error processing branch {ref.name}: {e}")
+                    continue
+
+            return branches
+
+    def checkout_branch(self, project_path: str, repo_name: str, branch_name: str, fresh: bool = False) -> CheckoutResult:
+
+        try:
+            
+            repo_folder_map = {
+                'content': 'outputs-dimensions-content',
+                'dimensions': 'outputs-dimensions'
+            }
+
+            if repo_name not in repo_folder_map:
+                return CheckoutResult(
+                    success=False,
+                    message=f"Invalid repository name: {repo_name}. Must be 'content' or 'dimensions'",
+                    current_branch="",
+                    repository=repo_name
+                )
+
+            repo_folder = repo_folder_map[repo_name]
+            repo_path = os.path.join(project_path, repo_folder)
+
+            if not os.path.exists(repo_path):
+                return CheckoutResult(
+                    success=False,
+                    message=f"Repository {repo_folder} not found in workspace: {repo_path}",
+                    current_branch="",
+                    repository=repo_name
+                )
 
             if not os.path.exists(os.path.join(repo_path, ".git")):
                 return CheckoutResult(
@@ -524,93 +1075,97 @@ class GitService:
                     repository=repo_name
                 )
 
-            repo = git.Repo(repo_path)
+            with self.repo_pool.borrow(repo_path) as repo:
 
-            
-            previous_branch = "unknown"
-            try:
-                previous_branch = repo.active_branch.name
-            except:
+                
+                previous_branch = "unknown"
                 try:
-                    previous_branch = repo.head.ref.name if repo.head.ref else "detached"
+                    previous_branch = repo.active_branch.name
                 except:
-                    previous_branch = "detached"
-
-            
-            try:
-                repo.remotes.origin.fetch()
-            except Exception as e:
-                print(f"Warning: Could not fetch from origin: {e}")
+                    try:
+                        previous_branch = repo.head.ref.name if repo.head.ref else "detached"
+                    except:
+                        previous_branch = "detached"
 
-            
-            clean_branch_name = branch_name.replace('origin/', '')
+                
+                clean_branch_name = branch_name.replace('origin/', '')
 
-            
-            try:
-                if repo.is_dirty(untracked_files=True):
-                    return CheckoutResult(
-                        success=False,
-                        message=f"Repository has uncommitted changes. Please commit or stash changes before checkout.",
-                        current_branch=previous_branch,
-                        repository=repo_name,
-                        previous_branch=previous_branch
+                # A branch only known to the remote still needs a fetch before it can be created locally
+                try:
+                    needs_fetch = fresh or (
+                        clean_branch_name not in [b.name for b in repo.heads]
+                        and f"origin/{clean_branch_name}" not in [ref.name for ref in repo.remotes.origin.refs]
                     )
-            except Exception as e:
-                print(f"Warning: Could not check if repo is dirty: {e}")
+                except Exception:
+                    needs_fetch = True
+                self._refresh_remote(repo_path, needs_fetch, "origin")
 
-            
-            try:
                 
-                local_branches = [b.name for b in repo.heads]
-
-                if clean_branch_name in local_branches:
-                    
-                    repo.heads[clean_branch_name].checkout()
-                    print(f"Checked out to existing local branch: {clean_branch_name}")
-                else:
-                    
-                    try:
-                        remote_ref = repo.remotes.origin.refs[clean_branch_name]
-                        local_branch = repo.create_head(clean_branch_name, remote_ref)
-                        local_branch.set_tracking_branch(remote_ref)
-                        local_branch.checkout()
-                        print(f"Created and checked out new local branch: {clean_branch_name}")
-                    except Exception as e:
+                try:
+                    if repo.is_dirty(untracked_files=True):
                         return CheckoutResult(
                             success=False,
-                            message=f"Could not find or create branch '{clean_branch_name}': {str(e)}",
+                            message=f"Repository has uncommitted changes. Please commit or stash changes before checkout.",
                             current_branch=previous_branch,
                             repository=repo_name,
                             previous_branch=previous_branch
                         )
-            except Exception as e:
-                return CheckoutResult(
-                    success=False,
-                    message=f"Checkout operation failed: {str(e)}",
-                    current_branch=previous_branch,
-                    repository=repo_name,
-                    previous_branch=previous_branch
-                )
+                except Exception as e:
+                    print(f"Warning: Could not check if repo is dirty: {e}")
 
-            
-            current_branch = previous_branch
-            try:
-                current_branch = repo.active_branch.name
-            except:
+                
+                try:
+                    
+                    local_branches = [b.name for b in repo.heads]
+
+                    if clean_branch_name in local_branches:
+                        
+                        repo.heads[clean_branch_name].checkout()
+                        print(f"Checked out to existing local branch: {clean_branch_name}")
+                    else:
+                        
+                        try:
+                            remote_ref = repo.remotes.origin.refs[clean_branch_name]
+                            local_branch = repo.create_head(clean_branch_name, remote_ref)
+                            local_branch.set_tracking_branch(remote_ref)
+                            local_branch.checkout()
+                            print(f"Created and checked out new local branch: {clean_branch_name}")
+                        except Exception as e:
+                            return CheckoutResult(
+                                success=False,
+                                message=f"Could not find or create branch '{clean_branch_name}': {str(e)}",
+                                current_branch=previous_branch,
+                                repository=repo_name,
+                                previous_branch=previous_branch
+                            )
+                except Exception as e:
+                    return CheckoutResult(
+                        success=False,
+                        message=f"Checkout operation failed: {str(e)}",
+                        current_branch=previous_branch,
+                        repository=repo_name,
+                        previous_branch=previous_branch
+                    )
+
+                
+                current_branch = previous_branch
                 try:
-                    current_branch = repo.head.ref.name if repo.head.ref else "detached"
+                    current_branch = repo.active_branch.name
                 except:
-                    current_branch = "unknown"
+                    try:
+                        current_branch = repo.head.ref.name if repo.head.ref else "detached"
+                    except:
+                        current_branch = "unknown"
 
-            success = current_branch == clean_branch_name
+                success = current_branch == clean_branch_name
 
-            return CheckoutResult(
-                success=success,
-                message=f"Successfully checked out to branch '{clean_branch_name}'" if success else f"Checkout may have failed. Current branch: {current_branch}",
-                current_branch=current_branch,
-                repository=repo_name,
-                previous_branch=previous_branch
-            )
+                return CheckoutResult(
+                    success=success,
+                    message=f"Successfully checked out to branch '{clean_branch_name}'" if success else f"Checkout may have failed. Current branch: {current_branch}",
+                    current_branch=current_branch,
+                    repository=repo_name,
+                    previous_branch=previous_branch
+                )
 
         except Exception as e:
             return CheckoutResult(
@@ -620,7 +1175,8 @@ class GitService:
                 repository=repo_name
             )
 
-    def compare_branch_with_master(self, project_path: str, repo_name: str, branch_name: str) -> BranchComparison:
+    def compare_branch_with_master(self, project_path: str, repo_name: str, branch_name: str,
+                                   fresh: bool = False, mode: str = "numstat") -> BranchComparison:
 
         try:
             
@@ -632,133 +1188,200 @@ class GitService:
             if repo_name not in repo_folder_map:
                 raise Exception(f"Invalid repository name: {repo_name}")
 
+            if mode not in COMPARISON_MODES:
+                raise Exception(f"Invalid comparison mode: {mode}. Must be one of {', '.join(COMPARISON_MODES)}")
+
             repo_folder = repo_folder_map[repo_name]
             repo_path = os.path.join(project_path, repo_folder)
 
             if not os.path.exists(repo_path):
                 raise Exception(f"Repository {repo_folder} not found at {repo_path}")
 
-            repo = git.Repo(repo_path)
+            self._refresh_remote(repo_path, fresh, repo_name)
+            with self.repo_pool.borrow(repo_path) as repo:
 
-            
-            try:
                 
                 try:
-                    master_ref = repo.remotes.origin.refs.master
-                except:
                     
-                    master_ref = repo.heads.master
-            except Exception as e:
-                raise Exception(f"Could not find master branch: {str(e)}")
-
-            
-            clean_branch_name = branch_name.replace('origin/', '')
+                    try:
+                        master_ref = repo.remotes.origin.refs.master
+                    except:
+                        
+                        master_ref = repo.heads.master
+                except Exception as e:
+                    raise Exception(f"Could not find master branch: {str(e)}")
 
-            try:
                 
+                clean_branch_name = branch_name.replace('origin/', '')
+
                 try:
-                    branch_ref = repo.remotes.origin.refs[clean_branch_name]
-                except:
                     
-                    branch_ref = repo.heads[clean_branch_name]
-            except Exception as e:
-                raise Exception(f"Could not find branch '{clean_branch_name}': {str(e)}")
-
-            
-            try:
-                diffs = master_ref.commit.diff(branch_ref.commit, create_patch=True)
-            except Exception as e:
-                raise Exception(f"Could not generate diff: {str(e)}")
-
-            files = []
-            total_additions = 0
-            total_deletions = 0
+                    try:
+                        branch_ref = repo.remotes.origin.refs[clean_branch_name]
+                    except:
+                        
+                        branch_ref = repo.heads[clean_branch_name]
+                except Exception as e:
+                    raise Exception(f"Could not find branch '{clean_branch_name}': {str(e)}")
 
-            for diff in diffs:
+                
                 try:
-                    
-                    if diff.new_file:
-                        change_type = "added"
-                    elif diff.deleted_file:
-                        change_type = "deleted"
-                    elif diff.renamed_file:
-                        change_type = "renamed"
+                    if mode == "patch":
+                        files = self._comparison_files_from_patches(master_ref.commit, branch_ref.commit)
                     else:
-                        change_type = "modified"
+                        files = self._comparison_files_from_numstat(repo, master_ref.commit.hexsha, branch_ref.commit.hexsha)
+                except Exception as e:
+                    raise Exception(f"Could not generate diff: {str(e)}")
 
-                    
-                    additions = 0
-                    deletions = 0
+                total_additions = sum(file_info.additions for file_info in files)
+                total_deletions = sum(file_info.deletions for file_info in files)
 
-                    if diff.diff:
-                        try:
-                            
-                            diff_text = ""
-                            try:
-                                diff_text = diff.diff.decode('utf-8')
-                            except UnicodeDecodeError:
-                                try:
-                                    diff_text = diff.diff.decode('latin-1')
-                                except:
-                                    diff_text = diff.diff.decode('utf-8', errors='ignore')
-
-                            if diff_text:
-                                lines = diff_text.split('\n')
-                                for line in lines:
-                                    if line.startswith('+') and not line.startswith('+++'):
-                                        additions += 1
-                                    elif line.startswith('-') and not line.startswith('---'):
-                                        deletions += 1
-                        except Exception as e:
-                            print(f"Warning: Could not process diff for {diff.a_path or diff.b_path}: {e}")
-                            
-                            if change_type == "added":
-                                additions = 1
-                            elif change_type == "deleted":
-                                deletions = 1
-                            else:
-                                additions = 1
-                                deletions = 1
+                
+                summary = f"{len(files)} files changed"
+                if total_additions > 0:
+                    summary += f", {total_additions} insertions(+)"
+                if total_deletions > 0:
+                    summary += f", {total_deletions} deletions(-)"
+
+                return BranchComparison(
+                    branch_name=clean_branch_name,
+                    base_branch="master",
+                    repository=repo_name,
+                    total_files=len(files),
+                    total_additions=total_additions,
+                    total_deletions=total_deletions,
+                    files=files,
+                    summary=summary
+                )
 
-                    total_additions += additions
-                    total_deletions += deletions
+        except Exception as e:
+            raise Exception(f"Failed to compare branches: {str(e)}")
 
-                    file_path = diff.a_path or diff.b_path or "unknown"
+    def _comparison_files_from_numstat(self, repo: git.Repo, base_sha: str, branch_sha: str) -> List[ComparisonFile]:
 
-                    files.append(ComparisonFile(
-                        path=file_path,
-                        change_type=change_type,
-                        additions=additions,
-                        deletions=deletions,
-                        old_path=diff.a_path if diff.renamed_file else None
-                    ))
+        # Plumbing diff-tree ignores external diff drivers and textconv, and never builds patch text
+        name_status = repo.git.diff_tree("-r", "-z", "-M", "--name-status", base_sha, branch_sha)
+        numstat = repo.git.diff_tree("-r", "-z", "-M", "--numstat", base_sha, branch_sha)
 
-                except Exception as e:
-                    print(f"Error processing diff item: {e}")
-                    continue
-                
-            
-            summary = f"{len(files)} files changed"
-            if total_additions > 0:
-                summary += f", {total_additions} insertions(+)"
-            if total_deletions > 0:
-                summary += f", {total_deletions} deletions(-)"
-
-            return BranchComparison(
-                branch_name=clean_branch_name,
-                base_branch="master",
-                repository=repo_name,
-                total_files=len(files),
-                total_additions=total_additions,
-                total_deletions=total_deletions,
-                files=files,
-                summary=summary
+        counts = {}
+        tokens = numstat.split("\x00")
+        i = 0
+        while i < len(tokens):
+            if not tokens[i]:
+                i += 1
+                continue
+
+            added, deleted, path = tokens[i].split("\t", 2)
+            if path:
+                i += 1
+            else:
+                path = tokens[i + 2]
+                i += 3
+
+            # Binary files report "-" for both counts
+            counts[path] = (
+                int(added) if added != "-" else 0,
+                int(deleted) if deleted != "-" else 0
             )
 
-        except Exception as e:
-            raise Exception(f"Failed to compare branches: {str(e)}")
+        files = []
+        tokens = name_status.split("\x00")
+        i = 0
+        while i < len(tokens):
+            status = tokens[i]
+            if not status:
+                i += 1
+                continue
+
+            if status[0] in "RC":
+                old_path, new_path = tokens[i + 1], tokens[i + 2]
+                i += 3
+            else:
+                old_path = new_path = tokens[i + 1]
+                i += 2
+
+            change_type = NAME_STATUS_CHANGE_TYPES.get(status[0], "modified")
+            additions, deletions = counts.get(new_path, (0, 0))
+
+            files.append(ComparisonFile(
+                path=old_path or new_path or "unknown",
+                change_type=change_type,
+                additions=additions,
+                deletions=deletions,
+                old_path=old_path if change_type == "renamed" else None
+            ))
 
-    def fetch_all_remote_branches(self, project_path: str) -> Dict[str, any]:
+        return files
+
+    def _comparison_files_from_patches(self, base_commit, branch_commit) -> List[ComparisonFile]:
+
+        diffs = base_commit.diff(branch_commit, create_patch=True)
+
+        files = []
+
+        for diff in diffs:
+            try:
+                
+                if diff.new_file:
+                    change_type = "added"
+                elif diff.deleted_file:
+                    change_type = "deleted"
+                elif diff.renamed_file:
+                    change_type = "renamed"
+                else:
+                    change_type = "modified"
+
+                
+                additions = 0
+                deletions = 0
+
+                if diff.diff:
+                    try:
+                        
+                        diff_text = ""
+                        try:
+                            diff_text = diff.diff.decode('utf-8')
+                        except UnicodeDecodeError:
+                            try:
+                                diff_text = diff.diff.decode('latin-1')
+                            except:
+                                diff_text = diff.diff.decode('utf-8', errors='ignore')
+
+                        if diff_text:
+                            lines = diff_text.split('\n')
+                            for line in lines:
+                                if line.startswith('+') and not line.startswith('+++'):
+                                    additions += 1
+                                elif line.startswith('-') and not line.startswith('---'):
+                                    deletions += 1
+                    except Exception as e:
+                        print(f"Warning: Could not process diff for {diff.a_path or diff.b_path}: {e}")
+                        
+                        if change_type == "added":
+                            additions = 1
+                        elif change_type == "deleted":
+                            deletions = 1
+                        else:
+                            additions = 1
+                            deletions = 1
+
+                file_path = diff.a_path or diff.b_path or "unknown"
+
+                files.append(ComparisonFile(
+                    path=file_path,
+                    change_type=change_type,
+                    additions=additions,
+                    deletions=deletions,
+                    old_path=diff.a_path if diff.renamed_file else None
+                ))
+
+            except Exception as e:
+                print(f"Error processing diff item: {e}")
+                continue
+
+        return files
+
+    async def fetch_all_remote_branches(self, project_path: str) -> Dict[str, any]:
         try:
             validation = self.validate_repositories_for_branches(project_path)
             if not validation["valid"]:
@@ -775,23 +1398,25 @@ class GitService:
                 'content': 'outputs-dimensions-content',
                 'dimensions': 'outputs-dimensions'
             }
-            
-            for repo_name, available in validation["repositories"].items():
-                if available:
-                    try:
-                        repo_folder = repo_folder_map[repo_name]
-                        repo_path = os.path.join(project_path, repo_folder)
-                        repo = git.Repo(repo_path)
-                        
-                        
-                        repo.remotes.origin.fetch()
-                        fetched_repos.append(repo_folder)
-                        print(f"Successfully fetched {repo_folder}")
-                        
-                    except Exception as e:
-                        error_msg = f"{repo_folder_map[repo_name]} fetch failed: {str(e)}"
-                        errors.append(error_msg)
-                        print(f"Error: {error_msg}")
+
+            repo_folders = [repo_folder_map[repo_name] for repo_name, available in validation["repositories"].items() if available]
+
+            # Shielded so a timeout here does not cancel a fetch other callers are waiting on
+            results = await asyncio.gather(*[
+                self._with_repo_timeout(asyncio.shield(asyncio.wrap_future(
+                    self.fetch_scheduler.request_fetch(os.path.join(project_path, repo_folder))
+                )))
+                for repo_folder in repo_folders
+            ], return_exceptions=True)
+            
+            for repo_folder, result in zip(repo_folders, results):
+                if isinstance(result, BaseException):
+                    error_msg = f"{repo_folder} fetch failed: {self._describe_error(result)}"
+                    errors.append(error_msg)
+                    print(f"Error: {error_msg}")
+                else:
+                    fetched_repos.append(repo_folder)
+                    print(f"Successfully fetched {repo_folder}")
             
             if fetched_repos:
                 return {
@@ -815,34 +1440,45 @@ class GitService:
                 "fetched_repos": []
             }
 
-    def get_repository_status(self, project_path: str) -> Dict[str, RepositoryStatus]:
+    async def get_repository_status(self, project_path: str) -> Dict[str, RepositoryStatus]:
         
         status = {}
         
-        repos = {
-            "content": "outputs-dimensions-content",
-            "dimensions": "outputs-dimensions"
-        }
+        repos = [
+            ("content", os.path.join(project_path, "outputs-dimensions-content")),
+            ("dimensions", os.path.join(project_path, "outputs-dimensions"))
+        ]
+
+        results = await self._run_per_repo(repos, self._repository_status)
         
-        for repo_name, repo_folder in repos.items():
-            repo_path = os.path.join(project_path, repo_folder)
+        for (repo_name, _), result in zip(repos, results):
+            if isinstance(result, BaseException):
+                print(f"Error getting status for {repo_name}: {self._describe_error(result)}")
+                result = RepositoryStatus(
+                    exists=True,
+                    is_git_repo=False,
+                    current_branch=None
+                )
+            status[repo_name] = result
+        
+        return status
+
+    def _repository_status(self, repo_name: str, repo_path: str) -> RepositoryStatus:
+
+        try:
+            if not os.path.exists(repo_path):
+                return RepositoryStatus(
+                    exists=False,
+                    is_git_repo=False
+                )
             
-            try:
-                if not os.path.exists(repo_path):
-                    status[repo_name] = RepositoryStatus(
-                        exists=False,
-                        is_git_repo=False
-                    )
-                    continue
-                
-                if not os.path.exists(os.path.join(repo_path, ".git")):
-                    status[repo_name] = RepositoryStatus(
-                        exists=True,
-                        is_git_repo=False
-                    )
-                    continue
-                
-                repo = git.Repo(repo_path)
+            if not os.path.exists(os.path.join(repo_path, ".git")):
+                return RepositoryStatus(
+                    exists=True,
+                    is_git_repo=False
+                )
+            
+            with self.repo_pool.borrow(repo_path) as repo:
                 
                 
                 current_branch = None
@@ -880,7 +1516,7 @@ class GitService:
                 except:
                     pass
                 
-                status[repo_name] = RepositoryStatus(
+                return RepositoryStatus(
                     exists=True,
                     is_git_repo=True,
                     current_branch=current_branch,
@@ -892,15 +1528,13 @@ class GitService:
                     remote_url=remote_url
                 )
                 
-            except Exception as e:
-                print(f"Error getting status for {repo_name}: {e}")
-                status[repo_name] = RepositoryStatus(
-                    exists=True,
-                    is_git_repo=False,
-                    current_branch=None
-                )
-        
-        return status
+        except Exception as e:
+            print(f"Error getting status for {repo_name}: {e}")
+            return RepositoryStatus(
+                exists=True,
+                is_git_repo=False,
+                current_branch=None
+            )
 
     
     
@@ -923,151 +1557,151 @@ class GitService:
             if not os.path.exists(repo_path):
                 raise Exception(f"Repository {repo_folder} not found")
             
-            repo = git.Repo(repo_path)
-            
-            
-            try:
-                master_ref = repo.remotes.origin.refs.master
-            except:
-                master_ref = repo.heads.master
-            
-            clean_branch_name = branch_name.replace('origin/', '')
-            
-            try:
-                branch_ref = repo.remotes.origin.refs[clean_branch_name]
-            except:
-                branch_ref = repo.heads[clean_branch_name]
-            
-            
-            diffs = master_ref.commit.diff(branch_ref.commit, paths=[file_path], create_patch=True)
-            
-            if not diffs:
+            with self.repo_pool.borrow(repo_path) as repo:
+                
                 
-                return FileDiff(
-                    path=file_path,
-                    old_content="",
-                    new_content="",
-                    diff_lines=[],
-                    change_type="unchanged"
-                )
-            
-            diff = diffs[0]
-            
-            
-            if diff.new_file:
-                change_type = "added"
-                old_content = ""
-                try:
-                    new_content = diff.b_blob.data_stream.read().decode('utf-8')
-                except:
-                    new_content = "[Binary file or encoding error]"
-            elif diff.deleted_file:
-                change_type = "deleted"
                 try:
-                    old_content = diff.a_blob.data_stream.read().decode('utf-8')
+                    master_ref = repo.remotes.origin.refs.master
                 except:
-                    old_content = "[Binary file or encoding error]"
-                new_content = ""
-            else:
-                change_type = "modified"
+                    master_ref = repo.heads.master
+                
+                clean_branch_name = branch_name.replace('origin/', '')
+                
                 try:
-                    old_content = diff.a_blob.data_stream.read().decode('utf-8') if diff.a_blob else ""
-                    new_content = diff.b_blob.data_stream.read().decode('utf-8') if diff.b_blob else ""
+                    branch_ref = repo.remotes.origin.refs[clean_branch_name]
                 except:
-                    old_content = "[Binary file or encoding error]"
-                    new_content = "[Binary file or encoding error]"
-            
-            
-            diff_lines = []
-            
-            if diff.diff:
-                try:
-                    diff_text = diff.diff.decode('utf-8')
-                    lines = diff_text.split('\n')
-                    
-                    old_line_num = 1
-                    new_line_num = 1
-                    
-                    for line in lines:
-                        if line.startswith('@@'):
-                            
-                            match = re.match(r'@@ -(\d+)(?:,\d+)? \+(\d+)(?:,\d+)? @@', line)
-                            if match:
-                                old_line_num = int(match.group(1))
-                                new_line_num = int(match.group(2))
-                            
-                            diff_lines.append(DiffLine(
-                                line_number_old=None,
-                                line_number_new=None,
-                                content=line,
-                                type="header"
-                            ))
-                        elif line.startswith('---') or line.startswith('+++'):
-                            
-                            diff_lines.append(DiffLine(
-                                line_number_old=None,
-                                line_number_new=None,
-                                content=line,
-                                type="header"
-                            ))
-                        elif line.startswith('-'):
-                            
-                            diff_lines.append(DiffLine(
-                                line_number_old=old_line_num,
-                                line_number_new=None,
-                                content=line[1:],  
-                                type="deleted"
-                            ))
-                            old_line_num += 1
-                        elif line.startswith('+'):
-                            
-                            diff_lines.append(DiffLine(
-                                line_number_old=None,
-                                line_number_new=new_line_num,
-                                content=line[1:],  
-                                type="added"
-                            ))
-                            new_line_num += 1
-                        elif line.startswith(' '):
-                            
-                            diff_lines.append(DiffLine(
-                                line_number_old=old_line_num,
-                                line_number_new=new_line_num,
-                                content=line[1:],  
-                                type="context"
-                            ))
-                            old_line_num += 1
-                            new_line_num += 1
-                        elif line.strip() == '':
-                            
-                            continue
-                        else:
-                            
-                            diff_lines.append(DiffLine(
-                                line_number_old=None,
-                                line_number_new=None,
-                                content=line,
-                                type="context"
-                            ))
-                            
-                except Exception as e:
-                    print(f"Error processing diff: {e}")
+                    branch_ref = repo.heads[clean_branch_name]
+                
+                
+                diffs = master_ref.commit.diff(branch_ref.commit, paths=[file_path], create_patch=True)
+                
+                if not diffs:
                     
-                    diff_lines = [DiffLine(
-                        line_number_old=None,
-                        line_number_new=None,
-                        content=f"Error processing diff: {str(e)}",
-                        type="header"
-                    )]
-            
-            return FileDiff(
-                path=file_path,
-                old_content=old_content,
-                new_content=new_content,
-                diff_lines=diff_lines,
-                change_type=change_type
-            )
-            
+                    return FileDiff(
+                        path=file_path,
+                        old_content="",
+                        new_content="",
+                        diff_lines=[],
+                        change_type="unchanged"
+                    )
+                
+                diff = diffs[0]
+                
+                
+                if diff.new_file:
+                    change_type = "added"
+                    old_content = ""
+                    try:
+                        new_content = diff.b_blob.data_stream.read().decode('utf-8')
+                    except:
+                        new_content = "[Binary file or encoding error]"
+                elif diff.deleted_file:
+                    change_type = "deleted"
+                    try:
+                        old_content = diff.a_blob.data_stream.read().decode('utf-8')
+                    except:
+                        old_content = "[Binary file or encoding error]"
+                    new_content = ""
+                else:
+                    change_type = "modified"
+                    try:
+                        old_content = diff.a_blob.data_stream.read().decode('utf-8') if diff.a_blob else ""
+                        new_content = diff.b_blob.data_stream.read().decode('utf-8') if diff.b_blob else ""
+                    except:
+                        old_content = "[Binary file or encoding error]"
+                        new_content = "[Binary file or encoding error]"
+                
+                
+                diff_lines = []
+                
+                if diff.diff:
+                    try:
+                        diff_text = diff.diff.decode('utf-8')
+                        lines = diff_text.split('\n')
+                        
+                        old_line_num = 1
+                        new_line_num = 1
+                        
+                        for line in lines:
+                            if line.startswith('@@'):
+                                
+                                match = re.match(r'@@ -(\d+)(?:,\d+)? \+(\d+)(?:,\d+)? @@', line)
+                                if match:
+                                    old_line_num = int(match.group(1))
+                                    new_line_num = int(match.group(2))
+                                
+                                diff_lines.append(DiffLine(
+                                    line_number_old=None,
+                                    line_number_new=None,
+                                    content=line,
+                                    type="header"
+                                ))
+                            elif line.startswith('---') or line.startswith('+++'):
+                                
+                                diff_lines.append(DiffLine(
+                                    line_number_old=None,
+                                    line_number_new=None,
+                                    content=line,
+                                    type="header"
+                                ))
+                            elif line.startswith('-'):
+                                
+                                diff_lines.append(DiffLine(
+                                    line_number_old=old_line_num,
+                                    line_number_new=None,
+                                    content=line[1:],  
+                                    type="deleted"
+                                ))
+                                old_line_num += 1
+                            elif line.startswith('+'):
+                                
+                                diff_lines.append(DiffLine(
+                                    line_number_old=None,
+                                    line_number_new=new_line_num,
+                                    content=line[1:],  
+                                    type="added"
+                                ))
+                                new_line_num += 1
+                            elif line.startswith(' '):
+                                
+                                diff_lines.append(DiffLine(
+                                    line_number_old=old_line_num,
+                                    line_number_new=new_line_num,
+                                    content=line[1:],  
+                                    type="context"
+                                ))
+                                old_line_num += 1
+                                new_line_num += 1
+                            elif line.strip() == '':
+                                
+                                continue
+                            else:
+                                
+                                diff_lines.append(DiffLine(
+                                    line_number_old=None,
+                                    line_number_new=None,
+                                    content=line,
+                                    type="context"
+                                ))
+                                
+                    except Exception as e:
+                        print(f"Error processing diff: {e}")
+                        
+                        diff_lines = [DiffLine(
+                            line_number_old=None,
+                            line_number_new=None,
+                            content=f"Error processing diff: {str(e)}",
+                            type="header"
+                        )]
+                
+                return FileDiff(
+                    path=file_path,
+                    old_content=old_content,
+                    new_content=new_content,
+                    diff_lines=diff_lines,
+                    change_type=change_type
+                )
+                
         except Exception as e:
             raise Exception(f"Failed to get file diff: {str(e)}")
 
@@ -1106,13 +1740,13 @@ class GitService:
             
             repo_folder = repo_folder_map[repo_name]
             repo_path = os.path.join(project_path, repo_folder)
-            repo = git.Repo(repo_path)
-            
-            commit = repo.commit(commit_sha)
-            blob = commit.tree / file_path
-            
-            return blob.data_stream.read().decode('utf-8')
-            
+            with self.repo_pool.borrow(repo_path) as repo:
+                
+                commit = repo.commit(commit_sha)
+                blob = commit.tree / file_path
+                
+                return blob.data_stream.read().decode('utf-8')
+                
         except Exception as e:
             return f"Error reading file: {str(e)}"
 
@@ -1125,48 +1759,48 @@ class GitService:
             
             repo_folder = repo_folder_map[repo_name]
             repo_path = os.path.join(project_path, repo_folder)
-            repo = git.Repo(repo_path)
-            
-            clean_branch_name = branch_name.replace('origin/', '')
-            
-            try:
-                branch_ref = repo.remotes.origin.refs[clean_branch_name]
-            except:
-                branch_ref = repo.heads[clean_branch_name]
-            
-            
-            tree = branch_ref.commit.tree
-            
-            def build_tree_structure(tree_obj, path=""):
-                items = []
+            with self.repo_pool.borrow(repo_path) as repo:
+                
+                clean_branch_name = branch_name.replace('origin/', '')
                 
-                for item in tree_obj:
-                    item_path = os.path.join(path, item.name) if path else item.name
+                try:
+                    branch_ref = repo.remotes.origin.refs[clean_branch_name]
+                except:
+                    branch_ref = repo.heads[clean_branch_name]
+                
+                
+                tree = branch_ref.commit.tree
+                
+                def build_tree_structure(tree_obj, path=""):
+                    items = []
                     
-                    if item.type == 'tree':  
-                        items.append({
-                            "name": item.name,
-                            "path": item_path,
-                            "type": "directory",
-                            "children": build_tree_structure(item, item_path)
-                        })
-                    else:  
-                        items.append({
-                            "name": item.name,
-                            "path": item_path,
-                            "type": "file",
-                            "size": item.size if hasattr(item, 'size') else 0
-                        })
+                    for item in tree_obj:
+                        item_path = os.path.join(path, item.name) if path else item.name
+                        
+                        if item.type == 'tree':  
+                            items.append({
+                                "name": item.name,
+                                "path": item_path,
+                                "type": "directory",
+                                "children": build_tree_structure(item, item_path)
+                            })
+                        else:  
+                            items.append({
+                                "name": item.name,
+                                "path": item_path,
+                                "type": "file",
+                                "size": item.size if hasattr(item, 'size') else 0
+                            })
+                    
+                    return sorted(items, key=lambda x: (x["type"] == "file", x["name"]))
+                
+                return {
+                    "branch": clean_branch_name,
+                    "repository": repo_name,
+                    "commit": branch_ref.commit.hexsha[:8],
+                    "tree": build_tree_structure(tree)
+                }
                 
-                return sorted(items, key=lambda x: (x["type"] == "file", x["name"]))
-            
-            return {
-                "branch": clean_branch_name,
-                "repository": repo_name,
-                "commit": branch_ref.commit.hexsha[:8],
-                "tree": build_tree_structure(tree)
-            }
-            
         except Exception as e:
             raise Exception(f"Failed to get file tree: {str(e)}")
 
@@ -0,0 +1,124 @@
+import os
+import re
+import fnmatch
+import logging
+import threading
+from typing import Any, Dict, List, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+PLACEHOLDER_PATTERN = re.compile(r'\[CHANGE\|([A-Za-z0-9_]+)\]')
+
+# Template roots may list extra files (globs relative to the root) that carry placeholders
+TEMPLATE_MANIFEST_NAME = ".kaptemplates"
+DEFAULT_TEMPLATED_FILES = ["job.ini"]
+
+
+
+
+
+class CompiledTemplate:
+
+    def __init__(self, relative_path: str, text: str):
+        self.relative_path = relative_path
+        self.literals: List[str] = []
+        self.keys: List[str] = []
+
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            self.literals.append(text[position:match.start()])
+            self.keys.append(match.group(1))
+            position = match.end()
+        self.literals.append(text[position:])
+
+        self.placeholders = sorted(set(self.keys))
+
+    def render(self, values: Dict[str, str]) -> Tuple[str, List[str]]:
+
+        parts = [self.literals[0]]
+        used = set()
+
+        for key, literal in zip(self.keys, self.literals[1:]):
+            value = values.get(key)
+            if value is None:
+                parts.append(f"[CHANGE|{key}]")
+            else:
+                parts.append(value)
+                used.add(key)
+            parts.append(literal)
+
+        return "".join(parts), [key for key in values if key in used]
+
+class JobTemplateService:
+
+    def __init__(self):
+        self._compiled: Dict[str, Tuple[Tuple[int, int], CompiledTemplate]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def compile_file(self, source_path: str, relative_path: str) -> CompiledTemplate:
+
+        stat = os.stat(source_path)
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._compiled.get(source_path)
+            if cached and cached[0] == key:
+                self.hits += 1
+                return cached[1]
+
+        with open(source_path, 'r', encoding='utf-8') as f:
+            compiled = CompiledTemplate(relative_path, f.read())
+
+        with self._lock:
+            self._compiled[source_path] = (key, compiled)
+            self.misses += 1
+
+        return compiled
+
+    def templated_files(self, template_root: str, relative_files: List[str]) -> List[str]:
+
+        patterns = list(DEFAULT_TEMPLATED_FILES)
+        manifest_path = os.path.join(template_root, TEMPLATE_MANIFEST_NAME)
+
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        line = line.strip()
+                        if line and not line.startswith('#'):
+                            patterns.append(line.replace('\\', '/'))
+            except Exception as e:
+                logger.warning(f"⚠️ Could not read {manifest_path}: {e}")
+
+        patterns = [pattern.lower() for pattern in patterns]
+
+        return [
+            rel for rel in relative_files
+            if any(fnmatch.fnmatchcase(rel.replace(os.sep, '/').lower(), pattern) for pattern in patterns)
+        ]
+
+    def load_templates(self, template_root: str, relative_files: List[str]) -> Tuple[List[CompiledTemplate], Dict[str, str]]:
+
+        templates = []
+        errors = {}
+
+        for rel in self.templated_files(template_root, relative_files):
+            try:
+                templates.append(self.compile_file(os.path.join(template_root, rel), rel))
+            except Exception as e:
+                errors[rel] = str(e)
+
+        return templates, errors
+
+    def describe(self) -> Dict[str, Any]:
+
+        with self._lock:
+            return {
+                "compiled_templates": len(self._compiled),
+                "hits": self.hits,
+                "misses": self.misses
+            }
@@ -0,0 +1,844 @@
+import os
+import re
+import time
+import codecs
+import bisect
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+EXCLUDED_CHUNK_FOLDERS = {
+    'Banners_Include_Set1', 'Banners_Include_Set2', 'CM_Edits', 'CM_Manipulation',
+    'CM_Metadata', 'ES_Metadata', 'ES_OnNextCase', 'IA_Lists', 'IA_Metadata',
+    'IA_OnNextCase', 'LinkDBManipulation', 'LinkDBMetadata', 'TEMP_eVal_CreateSPSS',
+    'Trim_Edits', 'Trim_Manipulation', 'Trim_Metadata'
+}
+
+CONTENT_CACHE_MAX_ENTRIES = 2048
+STREAM_SUMMARY_MAX_ENTRIES = 200
+STRUCTURE_CACHE_MAX_ENTRIES = 64
+RENDER_CACHE_MAX_ENTRIES = 4096
+
+DIMVAR_PATTERN = re.compile(r'DIMVAR=([^;"\s]+)')
+QUESTION_MARKER = '*QUESTION'
+
+CHUNK_LINE_PREFIX = "**\t                    "
+CHUNK_START_MARKER = "kap_output_chunk_start"
+CHUNK_END_MARKER = "kap_output_chunk_end"
+STRUCTURE_NOTES_LINE = "** Notes:"
+STRUCTURE_PROCESSOR_MARKER = "Data processor..: CHUNKS"
+
+ODIN_STREAM_CHUNK_SIZE = 1024 * 1024
+ODIN_STREAM_FLUSH_CHARS = 256 * 1024
+
+ODIN_BOM_ENCODINGS = [
+    (codecs.BOM_UTF16_LE, "utf-16-le", "UTF-16 LE with BOM"),
+    (codecs.BOM_UTF16_BE, "utf-16-be", "UTF-16 BE with BOM"),
+]
+
+
+
+
+
+def decode_chunk_bytes(content: bytes) -> Tuple[str, str, bool]:
+
+    if content.startswith(b'\xff\xfe'):
+        return content.decode('utf-16-le').replace('\ufeff', ''), "UTF-16 LE", True
+    elif content.startswith(b'\xfe\xff'):
+        return content.decode('utf-16-be').replace('\ufeff', ''), "UTF-16 BE", True
+    else:
+        return content.decode('utf-8', errors='ignore'), "UTF-8", content.startswith(b'\xef\xbb\xbf')
+
+class ChunkContent:
+
+    def __init__(self, file_path: str, text: str, encoding: str, has_bom: bool, size: int):
+        self.file_path = file_path
+        self.text = text
+        self.encoding = encoding
+        self.has_bom = has_bom
+        self.size = size
+        self._sha1: Optional[str] = None
+
+    @property
+    def sha1(self) -> str:
+
+        if self._sha1 is None:
+            self._sha1 = content_hash(self.text)
+        return self._sha1
+
+class ChunkContentCache:
+
+    def __init__(self, max_entries: int = CONTENT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], ChunkContent]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def read(self, file_path: str) -> ChunkContent:
+
+        stat = os.stat(file_path)
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._entries.get(file_path)
+            if cached and cached[0] == key:
+                self._entries.move_to_end(file_path)
+                self.hits += 1
+                return cached[1]
+
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+
+        text, encoding, has_bom = decode_chunk_bytes(raw)
+        content = ChunkContent(file_path, text, encoding, has_bom, len(raw))
+
+        with self._lock:
+            self.misses += 1
+            self._entries[file_path] = (key, content)
+            self._entries.move_to_end(file_path)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return content
+
+    def read_text(self, file_path: str) -> str:
+
+        return self.read(file_path).text
+
+    def clear(self):
+
+        with self._lock:
+            self._entries.clear()
+
+    def describe(self) -> Dict[str, Any]:
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "cached_bytes": sum(content.size for _, content in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None
+            }
+
+
+
+
+
+class ChunkIndex:
+
+    def __init__(self, template_chunks_path: str):
+        self.template_chunks_path = template_chunks_path
+        self.folders: List[str] = []
+        self.entries: Dict[str, List[Dict[str, str]]] = {}
+        self.mtimes: Dict[str, int] = {}
+        self.file_count = 0
+        self.built_at = datetime.now()
+        self.validated_at = time.monotonic()
+
+    @classmethod
+    def build(cls, template_chunks_path: str) -> "ChunkIndex":
+
+        index = cls(template_chunks_path)
+        started = time.perf_counter()
+
+        index.mtimes[template_chunks_path] = os.stat(template_chunks_path).st_mtime_ns
+
+        for folder in os.listdir(template_chunks_path):
+            folder_path = os.path.join(template_chunks_path, folder)
+            if folder in EXCLUDED_CHUNK_FOLDERS or not os.path.isdir(folder_path):
+                continue
+
+            index.folders.append(folder)
+
+            try:
+                index.mtimes[folder_path] = os.stat(folder_path).st_mtime_ns
+
+                for filename in os.listdir(folder_path):
+                    if not filename.endswith('.mrs'):
+                        continue
+
+                    file_basename = os.path.splitext(filename)[0]
+                    index.entries.setdefault(file_basename.lower(), []).append({
+                        "folder": folder,
+                        "fileName": file_basename,
+                        "file_path": os.path.join(folder_path, filename)
+                    })
+                    index.file_count += 1
+
+            except Exception as e:
+                logger.warning(f"⚠️ Could not scan folder {folder}: {str(e)}")
+
+        logger.info(
+            f"📁 Indexed {index.file_count} chunk files in {len(index.folders)} folders "
+            f"({time.perf_counter() - started:.3f}s): {template_chunks_path}"
+        )
+        return index
+
+    def is_current(self) -> bool:
+
+        try:
+            for path, mtime_ns in self.mtimes.items():
+                if os.stat(path).st_mtime_ns != mtime_ns:
+                    return False
+        except OSError:
+            return False
+
+        return True
+
+    def lookup(self, variable_name: str) -> List[Dict[str, str]]:
+
+        return self.entries.get(variable_name.lower(), [])
+
+    def describe(self) -> Dict[str, Any]:
+
+        return {
+            "template_chunks_path": self.template_chunks_path,
+            "folders": len(self.folders),
+            "files": self.file_count,
+            "variables": len(self.entries),
+            "built_at": self.built_at.isoformat()
+        }
+
+class ChunkIndexRegistry:
+
+    def __init__(self, revalidate_seconds: float = 2.0):
+        self.revalidate_seconds = revalidate_seconds
+        self._indexes: Dict[str, ChunkIndex] = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def get_index(self, template_chunks_path: str) -> ChunkIndex:
+
+        key = os.path.abspath(template_chunks_path)
+
+        with self._lock:
+            index = self._indexes.get(key)
+            now = time.monotonic()
+
+            if index is not None:
+                if now - index.validated_at < self.revalidate_seconds:
+                    return index
+                if index.is_current():
+                    index.validated_at = now
+                    return index
+
+            index = ChunkIndex.build(key)
+            self._indexes[key] = index
+            self.builds += 1
+            return index
+
+    def invalidate(self, template_chunks_path: Optional[str] = None):
+
+        with self._lock:
+            if template_chunks_path is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(os.path.abspath(template_chunks_path), None)
+
+    def describe(self) -> Dict[str, Any]:
+
+        with self._lock:
+            return {
+                "indexes": [index.describe() for index in self._indexes.values()],
+                "builds": self.builds,
+                "revalidate_seconds": self.revalidate_seconds
+            }
+
+
+
+
+
+def parse_dimvar(line: str) -> Optional[str]:
+
+    if 'DIMVAR=' not in line:
+        return None
+
+    dimvar_match = DIMVAR_PATTERN.search(line)
+    if not dimvar_match:
+        return None
+
+    variable_name = dimvar_match.group(1)
+    if variable_name.endswith('.slice'):
+        variable_name = variable_name.replace('.slice', '')
+
+    return variable_name
+
+def is_question_line(line: str) -> bool:
+
+    return QUESTION_MARKER in line and line.strip().startswith(QUESTION_MARKER)
+
+class QuestionIndex:
+
+    def __init__(self, positions: List[int]):
+        self.positions = positions
+
+    def next_after(self, line_index: int) -> int:
+
+        position = bisect.bisect_right(self.positions, line_index)
+        if position < len(self.positions):
+            return self.positions[position]
+        return -1
+
+def iter_rewritten_segments(lines: List[str], insertions: Dict[int, List[str]],
+                            removals: Optional[Dict[int, int]] = None) -> Iterator[str]:
+
+    # Joining the yielded segments gives the same text as splicing each structure's lines in front of its *QUESTION line
+    removals = removals or {}
+    first = True
+    start = 0
+
+    for position in sorted(set(insertions) | set(removals)):
+        if position > start:
+            yield ('' if first else '\n') + '\n'.join(lines[start:position])
+            first = False
+            start = position
+
+        for structure in insertions.get(position, []):
+            yield ('' if first else '\n') + structure
+            first = False
+
+        # Removed ranges are [position, end) in original line numbers
+        if position in removals:
+            start = max(start, removals[position])
+
+    if start < len(lines):
+        yield ('' if first else '\n') + '\n'.join(lines[start:])
+
+
+
+
+
+def strip_chunk_prefix(line: str) -> str:
+
+    return line[len(CHUNK_LINE_PREFIX):] if line.startswith(CHUNK_LINE_PREFIX) else line
+
+def content_hash(text: str) -> str:
+
+    return hashlib.sha1(text.encode('utf-8', errors='surrogatepass')).hexdigest()
+
+class ChunkBlockRenderer:
+
+    def __init__(self, max_entries: int = RENDER_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._blocks: "OrderedDict[Tuple[str, str, str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def render_block(self, chunk: Dict[str, Any]) -> str:
+
+        # Chunk text comes from the content cache, so the same str object (and its cached hash) is reused across lookups
+        key = (chunk['path'], chunk['fileName'], chunk['fileExt'], chunk['content'])
+
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is not None:
+                self._blocks.move_to_end(key)
+                self.hits += 1
+                return block
+
+        separator = '\n' + CHUNK_LINE_PREFIX
+        parts = [
+            CHUNK_START_MARKER,
+            f"path:{chunk['path']}",
+            f"fileName:{chunk['fileName']}",
+            f"fileExt:{chunk['fileExt']}",
+            "'content:David"
+        ]
+        parts.extend(chunk['content'].split('\n'))
+        parts.append(CHUNK_END_MARKER)
+        parts.append('')
+        block = separator + separator.join(parts)
+
+        with self._lock:
+            self.misses += 1
+            self._blocks[key] = block
+            while len(self._blocks) > self.max_entries:
+                self._blocks.popitem(last=False)
+
+        return block
+
+    def render_structure(self, chunks: List[Dict[str, Any]], variable_name: str) -> str:
+
+        if not chunks:
+            return ""
+
+        return ''.join(
+            [f"**{variable_name}\n{STRUCTURE_NOTES_LINE}\n**\t- {STRUCTURE_PROCESSOR_MARKER}"] +
+            [self.render_block(chunk) for chunk in chunks]
+        )
+
+    def describe(self) -> Dict[str, Any]:
+
+        with self._lock:
+            return {
+                "entries": len(self._blocks),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+class OdinStructure:
+
+    def __init__(self, sha256: str, line_count: int):
+        self.sha256 = sha256
+        self.line_count = line_count
+        self.dimvars: List[Dict[str, Any]] = []
+        self.questions: List[int] = []
+        self.chunk_blocks: List[Dict[str, Any]] = []
+        self.structures: List[Dict[str, Any]] = []
+        self.question_index = QuestionIndex(self.questions)
+        self.built_at = datetime.now()
+
+    @classmethod
+    def scan(cls, lines: List[str], sha256: str) -> "OdinStructure":
+
+        index = cls(sha256, len(lines))
+        finditer = DIMVAR_PATTERN.finditer
+        structure = None
+        structure_recorded = False
+        block = None
+        offset = 0
+
+        for i, line in enumerate(lines):
+            if 'DIMVAR=' in line:
+                for position, dimvar_match in enumerate(finditer(line)):
+                    raw_name = dimvar_match.group(1)
+                    variable_name = raw_name.replace('.slice', '') if raw_name.endswith('.slice') else raw_name
+                    index.dimvars.append({
+                        "line_index": i,
+                        "column": dimvar_match.start(),
+                        "offset": offset + dimvar_match.start(),
+                        "variable_name": variable_name,
+                        "raw_name": raw_name,
+                        "primary": position == 0,
+                        "in_chunk_structure": structure_recorded or block is not None,
+                        "original_line": line.strip()
+                    })
+
+            offset += len(line) + 1
+            stripped = line.strip()
+
+            if stripped.startswith(QUESTION_MARKER):
+                index.questions.append(i)
+
+            if block is not None:
+                if stripped.endswith(CHUNK_END_MARKER):
+                    block["end_line"] = i
+                    block["content_sha1"] = content_hash('\n'.join(block.pop("content_lines")))
+                    block.pop("in_content")
+                    if structure is not None:
+                        structure["end_line"] = i
+                    block = None
+                elif block["in_content"]:
+                    block["content_lines"].append(strip_chunk_prefix(line))
+                else:
+                    field = strip_chunk_prefix(line).strip()
+                    if field.startswith("'content:"):
+                        block["in_content"] = True
+                    elif ':' in field:
+                        key, value = field.split(':', 1)
+                        if key in ("path", "fileName", "fileExt"):
+                            block[key] = value
+                continue
+
+            if stripped.startswith('**') and stripped.endswith(CHUNK_START_MARKER):
+                if structure is not None and not structure_recorded:
+                    index.structures.append(structure)
+                    structure_recorded = True
+                block = {
+                    "start_line": i,
+                    "structure": len(index.structures) - 1 if structure is not None else None,
+                    "in_content": False,
+                    "content_lines": []
+                }
+                index.chunk_blocks.append(block)
+                if structure is not None:
+                    structure["blocks"].append(len(index.chunk_blocks) - 1)
+                continue
+
+            if structure is not None:
+                if stripped == '**' or (i == structure["start_line"] + 2 and 'Data processor' in stripped):
+                    structure["end_line"] = i
+                    if stripped.endswith(STRUCTURE_PROCESSOR_MARKER) and not structure_recorded:
+                        index.structures.append(structure)
+                        structure_recorded = True
+                    continue
+                structure = None
+                structure_recorded = False
+
+            # A "** Notes:" section is only ours to replace once it shows our marker or a chunk block;
+            # anything else is a note the user wrote and must be left alone
+            if stripped == STRUCTURE_NOTES_LINE and i > 0:
+                header = lines[i - 1].strip()
+                if header.startswith('**') and len(header) > 2 and not header.startswith('** '):
+                    structure = {
+                        "variable_name": header[2:],
+                        "start_line": i - 1,
+                        "end_line": i,
+                        "blocks": []
+                    }
+
+        # A block left open at EOF is kept without a hash so it is never treated as up to date
+        if block is not None:
+            block.pop("content_lines")
+            block.pop("in_content")
+            block["end_line"] = None
+            block["content_sha1"] = None
+
+        return index
+
+    def dimvar_entries(self) -> List[Dict[str, Any]]:
+
+        return [
+            {
+                "line_index": d["line_index"],
+                "variable_name": d["variable_name"],
+                "original_line": d["original_line"],
+                "in_chunk_structure": d["in_chunk_structure"]
+            }
+            for d in self.dimvars if d["primary"]
+        ]
+
+    def structures_by_question(self) -> Dict[Tuple[str, int], List[Dict[str, Any]]]:
+
+        grouped: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+
+        for structure in self.structures:
+            key = (structure["variable_name"], self.question_index.next_after(structure["start_line"]))
+            grouped.setdefault(key, []).append(structure)
+
+        return grouped
+
+    def structure_signature(self, structure: Dict[str, Any]) -> List[Tuple[str, str, Optional[str]]]:
+
+        return [
+            (self.chunk_blocks[b].get("path"), self.chunk_blocks[b].get("fileName"), self.chunk_blocks[b]["content_sha1"])
+            for b in structure["blocks"]
+        ]
+
+    def describe(self) -> Dict[str, Any]:
+
+        return {
+            "sha256": self.sha256,
+            "lines": self.line_count,
+            "dimvars": len(self.dimvars),
+            "primary_dimvars": len([d for d in self.dimvars if d["primary"]]),
+            "questions": len(self.questions),
+            "chunk_blocks": len(self.chunk_blocks),
+            "chunk_structures": len(self.structures),
+            "built_at": self.built_at.isoformat()
+        }
+
+class OdinStructureCache:
+
+    def __init__(self, max_entries: int = STRUCTURE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, OdinStructure]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, content_bytes: bytes, lines: List[str]) -> Tuple[OdinStructure, bool]:
+
+        sha256 = hashlib.sha256(content_bytes).hexdigest()
+
+        with self._lock:
+            structure = self._entries.get(sha256)
+            if structure is not None:
+                self._entries.move_to_end(sha256)
+                self.hits += 1
+                return structure, True
+
+        structure = OdinStructure.scan(lines, sha256)
+
+        with self._lock:
+            self.misses += 1
+            self._entries[sha256] = structure
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return structure, False
+
+    def describe(self) -> Dict[str, Any]:
+
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+
+
+
+def detect_odin_encoding(head: bytes) -> Tuple[str, bytes, str]:
+
+    for bom, codec, label in ODIN_BOM_ENCODINGS:
+        if head.startswith(bom):
+            return codec, bom, label
+    return "utf-8", b"", "UTF-8"
+
+def decode_odin_bytes(content: bytes) -> Tuple[str, str]:
+
+    codec, bom, encoding_label = detect_odin_encoding(content)
+
+    if bom:
+        return content.decode(codec).replace('\ufeff', ''), encoding_label
+    return content.decode(codec, errors='ignore'), encoding_label
+
+class OdinStreamRewriter:
+
+    # Structures are held only until the next *QUESTION line, which is where the bisect-based rewrite would put them
+    def __init__(self, resolve_chunks: Callable[[str], List[Dict[str, Any]]],
+                 render_structure: Callable[[List[Dict[str, Any]], str], str]):
+        self.resolve_chunks = resolve_chunks
+        self.render_structure = render_structure
+        self.results: List[Optional[Dict[str, Any]]] = []
+        self.pending: List[Tuple[int, str, int, List[Dict[str, Any]], str]] = []
+        self.line_count = 0
+        self.dimvar_count = 0
+        self.insertions = 0
+        self._first = True
+
+    def _segment(self, text: str) -> str:
+
+        if self._first:
+            self._first = False
+            return text
+        return '\n' + text
+
+    def feed_line(self, line: str) -> List[str]:
+
+        segments = []
+        line_index = self.line_count
+        self.line_count += 1
+
+        if self.pending and is_question_line(line):
+            for slot, variable_name, dimvar_line, chunks, structure in reversed(self.pending):
+                segments.append(self._segment(structure))
+                self.insertions += 1
+                self.results[slot] = {
+                    "variable_name": variable_name,
+                    "line_index": dimvar_line,
+                    "chunks_found": len(chunks),
+                    "existing_files": [f"{chunk['folder']}/{chunk['fileName']}.mrs" for chunk in chunks],
+                    "status": "SUCCESS - chunks inserted"
+                }
+            self.pending = []
+
+        segments.append(self._segment(line))
+
+        variable_name = parse_dimvar(line)
+        if variable_name:
+            self.dimvar_count += 1
+            chunks = self.resolve_chunks(variable_name)
+
+            if chunks:
+                self.pending.append((len(self.results), variable_name, line_index, chunks,
+                                     self.render_structure(chunks, variable_name)))
+                self.results.append(None)
+            else:
+                self.results.append({
+                    "variable_name": variable_name,
+                    "line_index": line_index,
+                    "chunks_found": 0,
+                    "status": "SKIPPED - no .mrs files found"
+                })
+
+        return segments
+
+    def finish(self) -> List[Dict[str, Any]]:
+
+        for slot, variable_name, dimvar_line, chunks, _ in self.pending:
+            self.results[slot] = {
+                "variable_name": variable_name,
+                "line_index": dimvar_line,
+                "chunks_found": len(chunks),
+                "status": "ERROR - no next QUESTION found"
+            }
+        self.pending = []
+
+        # Same ordering as the in-memory rewrite, which walks DIMVARs from the bottom up
+        return list(reversed(self.results))
+
+def iter_odin_stream(source: BinaryIO, rewriter: OdinStreamRewriter, codec: str, bom: bytes,
+                     chunk_size: int = ODIN_STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+
+    decoder = codecs.getincrementaldecoder(codec)(errors='ignore' if codec == "utf-8" else 'strict')
+    encoder = codecs.getincrementalencoder(codec)()
+    strip_bom = bool(bom)
+
+    if bom:
+        source.read(len(bom))
+        yield bom
+
+    pending_text = ''
+    output: List[str] = []
+    output_chars = 0
+
+    while True:
+        data = source.read(chunk_size)
+        final = not data
+        text = decoder.decode(data, final=final)
+
+        if strip_bom:
+            text = text.replace('\ufeff', '')
+
+        pending_text += text
+        lines = pending_text.split('\n')
+        pending_text = '' if final else lines.pop()
+
+        for line in lines:
+            for segment in rewriter.feed_line(line):
+                output.append(segment)
+                output_chars += len(segment)
+
+        if output and (final or output_chars >= ODIN_STREAM_FLUSH_CHARS):
+            yield encoder.encode(''.join(output))
+            output = []
+            output_chars = 0
+
+        if final:
+            break
+
+    tail = encoder.encode('', final=True)
+    if tail:
+        yield tail
+
+class StreamSummaryStore:
+
+    def __init__(self, max_entries: int = STREAM_SUMMARY_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._summaries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, summary_id: str, summary: Dict[str, Any]):
+
+        with self._lock:
+            self._summaries[summary_id] = summary
+            self._summaries.move_to_end(summary_id)
+
+            while len(self._summaries) > self.max_entries:
+                self._summaries.popitem(last=False)
+
+    def get(self, summary_id: str) -> Optional[Dict[str, Any]]:
+
+        with self._lock:
+            return self._summaries.get(summary_id)
+
+
+
+
+
+def rewrite_odin_file(source_path: str, destination_path: str,
+                      resolve_chunks: Callable[[str], List[Dict[str, Any]]],
+                      render_structure: Callable[[List[Dict[str, Any]], str], str]) -> Dict[str, Any]:
+
+    started = time.perf_counter()
+    rewriter = OdinStreamRewriter(resolve_chunks, render_structure)
+    temp_path = destination_path + ".part"
+    processed_size = 0
+
+    with open(source_path, 'rb') as source:
+        codec, bom, encoding_label = detect_odin_encoding(source.read(4))
+        source.seek(0)
+
+        try:
+            with open(temp_path, 'wb') as destination:
+                for block in iter_odin_stream(source, rewriter, codec, bom):
+                    destination.write(block)
+                    processed_size += len(block)
+
+            os.replace(temp_path, destination_path)
+        except BaseException:
+            # Never leave a half-written .part next to the user's sources
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+    processing_results = rewriter.finish()
+
+    return {
+        "encoding": encoding_label,
+        "dimvar_count": rewriter.dimvar_count,
+        "insertions_made": rewriter.insertions,
+        "skipped_no_files": len([r for r in processing_results if r["chunks_found"] == 0]),
+        "original_size": os.path.getsize(source_path),
+        "processed_size": processed_size,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "processing_results": processing_results
+    }
+
+class OdinBatchReport:
+
+    def __init__(self):
+        self.files: List[Dict[str, Any]] = []
+        self.with_chunks: Dict[str, Dict[str, Any]] = {}
+        self.without_chunks: Dict[str, List[str]] = {}
+        self.no_question: Dict[str, List[str]] = {}
+
+    def add_file(self, relative_path: str, result: Dict[str, Any]):
+
+        self.files.append({"file": relative_path, **{k: v for k, v in result.items() if k != "processing_results"}})
+
+        for entry in result.get("processing_results", []):
+            variable_name = entry["variable_name"]
+
+            if entry["chunks_found"] == 0:
+                files = self.without_chunks.setdefault(variable_name, [])
+            elif entry["status"].startswith("SUCCESS"):
+                summary = self.with_chunks.setdefault(variable_name, {"files": [], "chunk_files": []})
+                files = summary["files"]
+                for chunk_file in entry.get("existing_files", []):
+                    if chunk_file not in summary["chunk_files"]:
+                        summary["chunk_files"].append(chunk_file)
+            else:
+                files = self.no_question.setdefault(variable_name, [])
+
+            if relative_path not in files:
+                files.append(relative_path)
+
+    def add_error(self, relative_path: str, error: str):
+
+        self.files.append({"file": relative_path, "error": error})
+
+    def describe(self) -> Dict[str, Any]:
+
+        processed = [f for f in self.files if "error" not in f]
+
+        return {
+            "totals": {
+                "files": len(self.files),
+                "processed": len(processed),
+                "failed": len(self.files) - len(processed),
+                "dimvar_count": sum(f["dimvar_count"] for f in processed),
+                "insertions_made": sum(f["insertions_made"] for f in processed),
+                "variables_with_chunks": len(self.with_chunks),
+                "variables_without_chunks": len(self.without_chunks),
+                "variables_without_next_question": len(self.no_question)
+            },
+            "files": sorted(self.files, key=lambda f: f["file"]),
+            "variables_with_chunks": dict(sorted(self.with_chunks.items())),
+            "variables_without_chunks": dict(sorted(self.without_chunks.items())),
+            "variables_without_next_question": dict(sorted(self.no_question.items()))
+        }
@@ -0,0 +1,795 @@
+import os
+import re
+import json
+import time
+import uuid
+import asyncio
+import hashlib
+import shutil
+import logging
+import threading
+import xml.etree.ElementTree as ET
+import aiohttp
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+CHUNK_DB_RELATIVE_PATH = os.path.join("outputs-dimensions-content", "Template_Configuration", "CHUNK_DB.XML")
+CHUNK_DB_NAME_TAG = "NAME"
+
+# Exclusion entries starting with "_" (e.g. _CONTROL) match any variable ending with them
+EXCLUSION_SUFFIX_PREFIX = "_"
+SKIPPED_CONTENT_TYPES = {"Script", "InfoQuestion"}
+LABEL_SKIPPED_CONTENT_TYPES = SKIPPED_CONTENT_TYPES | {"LeftRightSliderQuestion"}
+
+MRS_WRITER_MAX_WORKERS = 8
+
+# Applied in this order by the original chained str.replace implementation
+LABEL_REPLACEMENTS = [
+    ("\u039d", ""), ("[b]", ""), ("[/b]", ""), ("[i]", ""), ("[/i]", ""), ("[u]", ""), ("[/u]", ""),
+    ("&amp;", "&"), ("&lt;", "<"), ("&gt;", ">"), ("&quot;", '"'), ("&#39;", "'")
+]
+
+# "&amp;" is decoded before the other entities, so "&amp;lt;" ends up as "<"
+LABEL_TOKEN_MAP = dict(LABEL_REPLACEMENTS)
+LABEL_TOKEN_MAP.update({f"&amp;{entity[1:]}": value for entity, value in LABEL_REPLACEMENTS[8:]})
+
+LABEL_TOKEN_PATTERN = re.compile("|".join(re.escape(token) for token in sorted(LABEL_TOKEN_MAP, key=len, reverse=True)))
+LABEL_BATCH_SEPARATOR = "\x00"
+
+RESPONSE_CODE_LABELS = {"997": "NA", "998": "REF", "999": "DK"}
+
+PRODUCT_CHUNKS_STAGES = ["download", "index", "diff", "write", "report"]
+PRODUCT_CHUNKS_MAX_JOBS = 100
+
+PRODUCT_TEMPLATE_URL = "https://sandbox3-kap-product-template.azurewebsites.net/api/producttemplate/product/{product}"
+PRODUCT_TEMPLATE_CACHE_DIR = os.path.join(".kaptools_cache", "product_templates")
+PRODUCT_TEMPLATE_TTL_SECONDS = 15 * 60
+PRODUCT_TEMPLATE_TIMEOUT_SECONDS = 120
+PRODUCT_TEMPLATE_PARSED_MAX_ENTRIES = 8
+
+
+
+
+
+def get_chunk_db_path(workspace_path: str) -> str:
+
+    return os.path.join(workspace_path, CHUNK_DB_RELATIVE_PATH)
+
+class ChunkDbIndex:
+
+    def __init__(self, xml_path: str, names: FrozenSet[str], mtime_ns: int, size: int, elements: int):
+        self.xml_path = xml_path
+        self.names = names
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.elements = elements
+        self.built_at = datetime.now()
+
+    @classmethod
+    def parse(cls, xml_path: str) -> "ChunkDbIndex":
+
+        stat = os.stat(xml_path)
+        names = set()
+        elements = 0
+        root = None
+
+        # Finished elements are dropped from the root as we go so memory does not grow with the file
+        for event, element in ET.iterparse(xml_path, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = element
+                continue
+
+            if element.tag == CHUNK_DB_NAME_TAG:
+                elements += 1
+                if element.text:
+                    names.add(element.text.upper())
+
+                if element is not root:
+                    root.clear()
+
+        logger.info(f"📋 CHUNK_DB.XML indexed: {len(names)} names from {elements} entries")
+        return cls(xml_path, frozenset(names), stat.st_mtime_ns, stat.st_size, elements)
+
+    def is_current(self) -> bool:
+
+        try:
+            stat = os.stat(self.xml_path)
+        except OSError:
+            return False
+
+        return stat.st_mtime_ns == self.mtime_ns and stat.st_size == self.size
+
+    def contains(self, name: str) -> bool:
+
+        return name.upper() in self.names
+
+    def lookup(self, names: Iterable[str]) -> Dict[str, bool]:
+
+        return {name: name.upper() in self.names for name in names}
+
+    def describe(self) -> Dict[str, Any]:
+
+        return {
+            "xml_path": self.xml_path,
+            "names": len(self.names),
+            "entries": self.elements,
+            "size": self.size,
+            "built_at": self.built_at.isoformat()
+        }
+
+class ChunkDbRegistry:
+
+    def __init__(self):
+        self._indexes: Dict[str, ChunkDbIndex] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def get_index(self, workspace_path: str) -> Optional[ChunkDbIndex]:
+
+        xml_path = os.path.abspath(get_chunk_db_path(workspace_path))
+
+        with self._lock:
+            index = self._indexes.get(xml_path)
+            if index is not None and index.is_current():
+                self.hits += 1
+                return index
+
+            if not os.path.exists(xml_path):
+                self._indexes.pop(xml_path, None)
+                return None
+
+            index = ChunkDbIndex.parse(xml_path)
+            self._indexes[xml_path] = index
+            self.builds += 1
+            return index
+
+    def invalidate(self, workspace_path: Optional[str] = None):
+
+        with self._lock:
+            if workspace_path is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(os.path.abspath(get_chunk_db_path(workspace_path)), None)
+
+    def describe(self) -> Dict[str, Any]:
+
+        with self._lock:
+            return {
+                "indexes": [index.describe() for index in self._indexes.values()],
+                "hits": self.hits,
+                "builds": self.builds
+            }
+
+
+
+
+
+class ExclusionMatcher:
+
+    def __init__(self, items: Iterable[str]):
+        normalized = {item.strip().upper() for item in items if item and item.strip()}
+        self.exact = frozenset(normalized)
+        self.suffixes = tuple(sorted(item for item in normalized if item.startswith(EXCLUSION_SUFFIX_PREFIX)))
+
+    def is_excluded(self, name: str) -> bool:
+
+        name = name.upper()
+        return name in self.exact or (bool(self.suffixes) and name.endswith(self.suffixes))
+
+    def describe(self) -> Dict[str, Any]:
+
+        return {
+            "exact": len(self.exact),
+            "suffix_patterns": list(self.suffixes)
+        }
+
+def extract_group_names(json_data: Dict[str, Any]) -> List[str]:
+
+    group_names = []
+
+    for module in json_data["modules"]:
+        for question in module["questions"]:
+            if question.get("contentType") in SKIPPED_CONTENT_TYPES:
+                continue
+
+            if question.get("answers") or question.get("columns"):
+                group_name = question.get("groupName")
+                if group_name:
+                    group_names.append(group_name.upper())
+
+    return group_names
+
+def diff_variables(variables: List[str], existing_names: FrozenSet[str]) -> Tuple[List[str], List[str]]:
+
+    existing = []
+    new = []
+
+    for name in variables:
+        if name in existing_names:
+            existing.append(name)
+        else:
+            new.append(name)
+
+    return existing, new
+
+class ProductQuestionIndex:
+
+    def __init__(self, json_data: Dict[str, Any]):
+        self.by_group: Dict[str, List[Dict[str, Any]]] = {}
+        self.question_count = 0
+
+        for module in json_data.get("modules") or []:
+            for question in module.get("questions") or []:
+                self.question_count += 1
+
+                if question.get("contentType") in LABEL_SKIPPED_CONTENT_TYPES:
+                    continue
+
+                group_name = question.get("groupName")
+                if group_name:
+                    self.by_group.setdefault(group_name, []).append(question)
+
+    def questions_for(self, group_name: str) -> List[Dict[str, Any]]:
+
+        return self.by_group.get(group_name, [])
+
+
+
+
+
+def encode_mrs_text(text: str) -> bytes:
+
+    # Same bytes a text-mode write would produce on this platform
+    if os.linesep != '\n':
+        text = text.replace('\n', os.linesep)
+    return text.encode('utf-8')
+
+class MrsStagingWriter:
+
+    def __init__(self, max_workers: int = MRS_WRITER_MAX_WORKERS):
+        self.max_workers = max_workers
+
+    def write(self, target_dir: str, elements: List[str],
+              render: Callable[[str], str], fallback: Callable[[str], str]) -> Dict[str, Any]:
+
+        counts: Dict[str, int] = {}
+        for element in elements:
+            if element:
+                counts[element] = counts.get(element, 0) + 1
+
+        parent, name = os.path.split(os.path.abspath(target_dir))
+        token = uuid.uuid4().hex[:8]
+        staging_dir = os.path.join(parent, f".{name}.staging-{token}")
+        os.makedirs(staging_dir)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="mrs-writer") as executor:
+                outcomes = list(executor.map(
+                    lambda element: self._write_one(element, target_dir, staging_dir, render, fallback),
+                    list(counts)
+                ))
+
+            self._swap(target_dir, staging_dir, token)
+        except Exception:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+
+        stats = {"written": 0, "unchanged": 0, "failed": 0}
+        files_created = 0
+
+        for element, status in outcomes:
+            stats[status] += 1
+            if status != "failed":
+                files_created += counts[element]
+
+        stats["files_created"] = files_created
+        return stats
+
+    def _write_one(self, element: str, target_dir: str, staging_dir: str,
+                   render: Callable[[str], str], fallback: Callable[[str], str]) -> Tuple[str, str]:
+
+        file_name = f"{element.capitalize()}.mrs"
+        staged_path = os.path.join(staging_dir, file_name)
+        current_path = os.path.join(target_dir, file_name)
+
+        try:
+            try:
+                data = encode_mrs_text(render(element))
+            except UnicodeEncodeError:
+                data = encode_mrs_text(fallback(element))
+
+            if self._same_content(current_path, data):
+                try:
+                    os.link(current_path, staged_path)
+                except OSError:
+                    shutil.copy2(current_path, staged_path)
+                return element, "unchanged"
+
+            with open(staged_path, 'wb') as f:
+                f.write(data)
+            return element, "written"
+
+        except Exception as e:
+            logger.error(f"❌ Error creating file {file_name}: {str(e)}")
+            return element, "failed"
+
+    def _same_content(self, path: str, data: bytes) -> bool:
+
+        try:
+            if os.path.getsize(path) != len(data):
+                return False
+            with open(path, 'rb') as f:
+                return f.read() == data
+        except OSError:
+            return False
+
+    def _swap(self, target_dir: str, staging_dir: str, token: str):
+
+        if not os.path.exists(target_dir):
+            os.rename(staging_dir, target_dir)
+            return
+
+        parent, name = os.path.split(os.path.abspath(target_dir))
+        retired_dir = os.path.join(parent, f".{name}.old-{token}")
+
+        # Two renames, not one atomic swap: target_dir is briefly absent between them
+        os.rename(target_dir, retired_dir)
+        try:
+            os.rename(staging_dir, target_dir)
+        except OSError:
+            try:
+                os.rename(retired_dir, target_dir)
+            except OSError as e:
+                logger.error(f"❌ Could not restore {target_dir}; previous contents left in {retired_dir}: {str(e)}")
+            raise
+
+        try:
+            shutil.rmtree(retired_dir)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not remove retired folder {retired_dir}: {str(e)}")
+
+
+
+
+
+class KeyedLocks:
+
+    def __init__(self):
+        self._locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: str):
+
+        # Locks only live while someone holds or waits on them, so keys never accumulate
+        lock, users = self._locks.get(key, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._locks[key] = (lock, users + 1)
+
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._locks[key]
+            if users == 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, users - 1)
+
+    def locked(self, key: str) -> bool:
+
+        return key in self._locks
+
+    def __len__(self) -> int:
+
+        return len(self._locks)
+
+def token_fingerprint(token: Optional[str]) -> Optional[str]:
+
+    token = (token or "").strip()
+    return hashlib.sha256(token.encode("utf-8")).hexdigest() if token else None
+
+class ProductTemplateError(Exception):
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+class ProductTemplateCache:
+
+    def __init__(self, ttl_seconds: int = PRODUCT_TEMPLATE_TTL_SECONDS, pool_size: int = 8,
+                 max_parsed: int = PRODUCT_TEMPLATE_PARSED_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.pool_size = pool_size
+        self.max_parsed = max_parsed
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._locks = KeyedLocks()
+        self._parsed: "OrderedDict[str, Tuple[str, float, Dict[str, Any]]]" = OrderedDict()
+        self.stats = {"fresh": 0, "revalidated": 0, "downloaded": 0, "unchanged": 0}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=PRODUCT_TEMPLATE_TIMEOUT_SECONDS),
+                connector=aiohttp.TCPConnector(limit=self.pool_size, ssl=False)
+            )
+        return self._session
+
+    async def close(self):
+
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _paths(self, workspace_path: str, product_name: str, version: str) -> Tuple[str, str]:
+
+        cache_dir = os.path.join(workspace_path, PRODUCT_TEMPLATE_CACHE_DIR)
+        stem = f"{product_name}@{version or 'latest'}"
+        return os.path.join(cache_dir, f"{stem}.json"), os.path.join(cache_dir, f"{stem}.meta.json")
+
+    def _load_meta(self, meta_path: str, body_path: str) -> Optional[Dict[str, Any]]:
+
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return None
+
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ Ignoring unreadable product template metadata {meta_path}: {e}")
+            return None
+
+    def _save(self, meta_path: str, meta: Dict[str, Any], body_path: Optional[str] = None, body: Optional[bytes] = None):
+
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+
+        if body is not None:
+            with open(body_path + ".part", 'wb') as f:
+                f.write(body)
+            os.replace(body_path + ".part", body_path)
+
+        with open(meta_path + ".part", 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(meta_path + ".part", meta_path)
+
+    async def get(self, token: str, product_name: str, workspace_path: str,
+                  version: str = "", force_refresh: bool = False) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+
+        key = f"{os.path.abspath(workspace_path)}|{product_name}|{version}"
+
+        async with self._locks.hold(key):
+            loop = asyncio.get_running_loop()
+            body_path, meta_path = self._paths(workspace_path, product_name, version)
+            meta = None if force_refresh else await loop.run_in_executor(None, self._load_meta, meta_path, body_path)
+
+            # The TTL only skips the server for the token that last fetched successfully;
+            # blank or different tokens still go through the server's own check
+            token_hash = token_fingerprint(token)
+            ttl_valid = meta and time.time() - meta.get("fetched_at", 0) < self.ttl_seconds
+
+            if ttl_valid and token_hash and meta.get("token_sha256") == token_hash:
+                source = "fresh"
+            else:
+                meta, source = await self._fetch(token, product_name, version, force_refresh, meta, body_path, meta_path)
+
+            self.stats[source] += 1
+
+            json_data = self._cached_parsed(key, meta["sha256"])
+            if json_data is None:
+                json_data = await loop.run_in_executor(None, self._read_json, body_path)
+                self._store_parsed(key, meta["sha256"], json_data)
+
+            exported = await loop.run_in_executor(
+                None, self._export, workspace_path, product_name, json_data, meta, meta_path
+            )
+
+            logger.info(f"📦 Product template {product_name}@{version or 'latest'}: {source}")
+
+            return json_data, {
+                "source": source,
+                "sha256": meta["sha256"],
+                "etag": meta.get("etag"),
+                "last_modified": meta.get("last_modified"),
+                "fetched_at": datetime.fromtimestamp(meta["fetched_at"]).isoformat(),
+                "workspace_json_written": exported
+            }
+
+    def _cached_parsed(self, key: str, sha256: str) -> Optional[Dict[str, Any]]:
+
+        now = time.time()
+        for stale_key in [k for k, (_, parsed_at, _) in self._parsed.items() if now - parsed_at >= self.ttl_seconds]:
+            del self._parsed[stale_key]
+
+        cached = self._parsed.get(key)
+        if cached is None or cached[0] != sha256:
+            return None
+
+        self._parsed.move_to_end(key)
+        return cached[2]
+
+    def _store_parsed(self, key: str, sha256: str, json_data: Dict[str, Any]):
+
+        self._parsed[key] = (sha256, time.time(), json_data)
+        self._parsed.move_to_end(key)
+
+        while len(self._parsed) > self.max_parsed:
+            self._parsed.popitem(last=False)
+
+    async def _fetch(self, token: str, product_name: str, version: str, force_refresh: bool,
+                     meta: Optional[Dict[str, Any]], body_path: str, meta_path: str) -> Tuple[Dict[str, Any], str]:
+
+        headers = {"x-jetstream-devtoken": token}
+        if meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        params = {
+            "languages": "en-gb",
+            "refreshCache": "true" if force_refresh else "false",
+            "version": version
+        }
+
+        try:
+            async with self._get_session().get(
+                PRODUCT_TEMPLATE_URL.format(product=product_name), headers=headers, params=params
+            ) as response:
+                status = response.status
+                body = await response.read() if status == 200 else None
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+        except Exception as e:
+            raise ProductTemplateError(500, f"An error occurred: {str(e)}")
+
+        loop = asyncio.get_running_loop()
+
+        if status == 304 and meta:
+            meta["fetched_at"] = time.time()
+            meta["token_sha256"] = token_fingerprint(token)
+            await loop.run_in_executor(None, self._save, meta_path, meta)
+            return meta, "revalidated"
+
+        if status != 200:
+            raise ProductTemplateError(
+                status,
+                f"Failed to download Postman Collection (Verify Product Name Exists). HTTP status code: {status}"
+            )
+
+        sha256 = hashlib.sha256(body).hexdigest()
+        previous = meta or await loop.run_in_executor(None, self._load_meta, meta_path, body_path) or {}
+        unchanged = previous.get("sha256") == sha256
+
+        new_meta = {
+            "product_name": product_name,
+            "version": version,
+            "sha256": sha256,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+            "token_sha256": token_fingerprint(token),
+            "exported_sha256": previous.get("exported_sha256")
+        }
+        await loop.run_in_executor(None, self._save, meta_path, new_meta, body_path, None if unchanged else body)
+
+        return new_meta, "unchanged" if unchanged else "downloaded"
+
+    def _read_json(self, body_path: str) -> Dict[str, Any]:
+
+        with open(body_path, 'rb') as f:
+            return json.loads(f.read())
+
+    def _export(self, workspace_path: str, product_name: str, json_data: Dict[str, Any],
+                meta: Dict[str, Any], meta_path: str) -> bool:
+
+        json_path = os.path.join(workspace_path, f"{product_name}.json")
+
+        if meta.get("exported_sha256") == meta["sha256"] and os.path.exists(json_path):
+            return False
+
+        with open(json_path, "w", encoding='utf-8') as file:
+            json.dump(json_data, file, indent=4)
+
+        meta["exported_sha256"] = meta["sha256"]
+        self._save(meta_path, meta)
+        return True
+
+    def describe(self) -> Dict[str, Any]:
+
+        return {
+            "ttl_seconds": self.ttl_seconds,
+            "parsed_templates": len(self._parsed),
+            "max_parsed_templates": self.max_parsed,
+            "requests": dict(self.stats),
+            "session_open": self._session is not None and not self._session.closed
+        }
+
+
+
+
+
+def _replace_label_token(match) -> str:
+
+    return LABEL_TOKEN_MAP[match.group(0)]
+
+def clean_label_text_chained(text: str) -> str:
+
+    for token, value in LABEL_REPLACEMENTS:
+        text = text.replace(token, value)
+    return text
+
+def clean_label_text(text: str) -> str:
+
+    cleaned = LABEL_TOKEN_PATTERN.sub(_replace_label_token, text)
+
+    # A token left over means a removal joined its neighbours into a new token; only the chain handles that exactly
+    if LABEL_TOKEN_PATTERN.search(cleaned):
+        return clean_label_text_chained(text)
+    return cleaned
+
+def clean_label_texts(texts: List[str]) -> List[str]:
+
+    if not texts:
+        return []
+
+    joined = LABEL_BATCH_SEPARATOR.join(texts)
+    cleaned = LABEL_TOKEN_PATTERN.sub(_replace_label_token, joined).split(LABEL_BATCH_SEPARATOR)
+
+    if len(cleaned) != len(texts):
+        return [clean_label_text(text) for text in texts]
+
+    return [
+        clean_label_text_chained(original) if LABEL_TOKEN_PATTERN.search(result) else result
+        for original, result in zip(texts, cleaned)
+    ]
+
+def response_code_label(code: Any) -> str:
+
+    code = str(code)
+    return RESPONSE_CODE_LABELS.get(code, f"_{code}")
+
+
+
+
+
+def workspace_key(workspace_path: str) -> str:
+
+    return os.path.normcase(os.path.abspath(workspace_path))
+
+class JobCancelled(Exception):
+    pass
+
+class ProductChunksJob:
+
+    def __init__(self, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.status = "queued"
+        self.stages: Dict[str, Dict[str, Any]] = {name: {"status": "pending"} for name in PRODUCT_CHUNKS_STAGES}
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[Dict[str, Any]] = None
+        self.cancel_requested = False
+        self.task: Optional[asyncio.Task] = None
+
+    def stage(self, name: str, status: str, detail: Optional[Dict[str, Any]] = None):
+
+        # Cancellation lands when the next stage starts; a stage already running in an executor thread finishes first
+        if self.cancel_requested and status == "running":
+            raise JobCancelled()
+
+        entry = self.stages[name]
+        entry["status"] = status
+        entry["started_at" if status == "running" else "completed_at"] = datetime.now().isoformat()
+        if detail:
+            entry["detail"] = detail
+
+    def describe(self) -> Dict[str, Any]:
+
+        completed = len([s for s in self.stages.values() if s["status"] == "completed"])
+
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "params": self.params,
+            "progress": round(completed / len(self.stages), 2),
+            "current_stage": next((name for name, s in self.stages.items() if s["status"] == "running"), None),
+            "stages": self.stages,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "result": self.result,
+            "error": self.error
+        }
+
+class ProductChunksJobManager:
+
+    def __init__(self, max_jobs: int = PRODUCT_CHUNKS_MAX_JOBS):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, ProductChunksJob]" = OrderedDict()
+
+    def submit(self, runner: Callable[[ProductChunksJob], Awaitable[Dict[str, Any]]],
+               params: Dict[str, Any]) -> ProductChunksJob:
+
+        job = ProductChunksJob(params)
+        self._jobs[job.id] = job
+        self._prune()
+
+        job.task = asyncio.get_running_loop().create_task(self._run(job, runner))
+        return job
+
+    async def _run(self, job: ProductChunksJob, runner: Callable[[ProductChunksJob], Awaitable[Dict[str, Any]]]):
+
+        if not job.cancel_requested:
+            job.status = "running"
+
+        try:
+            job.result = await runner(job)
+            job.status = "completed"
+        except (JobCancelled, asyncio.CancelledError):
+            job.status = "cancelled"
+            for stage in job.stages.values():
+                if stage["status"] == "running":
+                    stage["status"] = "cancelled"
+        except Exception as e:
+            job.status = "failed"
+            job.error = {
+                "status_code": getattr(e, "status_code", 500),
+                "detail": getattr(e, "detail", str(e))
+            }
+            for stage in job.stages.values():
+                if stage["status"] == "running":
+                    stage["status"] = "failed"
+            logger.error(f"❌ Product chunks job {job.id} failed: {job.error['detail']}")
+        finally:
+            job.finished_at = datetime.now()
+
+    def _prune(self):
+
+        while len(self._jobs) > self.max_jobs:
+            oldest_id = next((job_id for job_id, job in self._jobs.items() if job.finished_at), None)
+            if oldest_id is None:
+                break
+            self._jobs.pop(oldest_id)
+
+    def get(self, job_id: str) -> Optional[ProductChunksJob]:
+
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+
+        job = self._jobs.get(job_id)
+        if job is None or job.finished_at is not None:
+            return False
+
+        # The task is not cancelled outright: that would orphan a writer thread mid-stage
+        job.cancel_requested = True
+        job.status = "cancelling"
+        return True
+
+    def active_for(self, workspace_path: str) -> Optional[ProductChunksJob]:
+
+        key = workspace_key(workspace_path)
+        return next(
+            (job for job in self._jobs.values()
+             if job.finished_at is None and workspace_key(job.params.get("workspace_path", "")) == key),
+            None
+        )
+
+    def describe(self) -> List[Dict[str, Any]]:
+
+        return [
+            {"job_id": job.id, "status": job.status, "params": job.params, "created_at": job.created_at.isoformat()}
+            for job in reversed(self._jobs.values())
+        ]
@@ -0,0 +1,386 @@
+import os
+import time
+import errno
+import shutil
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+
+FICLONE = 0x40049409
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+FAST_PATH_UNSUPPORTED = {
+    errno.EXDEV, errno.EINVAL, errno.ENOTTY, errno.EOPNOTSUPP, errno.ENOSYS, errno.EBADF
+}
+
+
+
+
+
+def find_repository_root(path: str) -> Optional[str]:
+
+    current = os.path.abspath(path)
+    while True:
+        if os.path.exists(os.path.join(current, ".git")):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+def read_head_commit(repo_path: str) -> Optional[str]:
+
+    try:
+        git_dir = os.path.join(repo_path, ".git")
+        if os.path.isfile(git_dir):
+            with open(git_dir, "r", encoding="utf-8") as f:
+                pointer = f.read().strip()
+            if pointer.startswith("gitdir:"):
+                git_dir = os.path.normpath(os.path.join(repo_path, pointer[len("gitdir:"):].strip()))
+
+        with open(os.path.join(git_dir, "HEAD"), "r", encoding="utf-8") as f:
+            head = f.read().strip()
+
+        if not head.startswith("ref:"):
+            return head
+
+        ref_name = head[len("ref:"):].strip()
+        common_dir = git_dir
+        commondir_file = os.path.join(git_dir, "commondir")
+        if os.path.exists(commondir_file):
+            with open(commondir_file, "r", encoding="utf-8") as f:
+                common_dir = os.path.normpath(os.path.join(git_dir, f.read().strip()))
+
+        for base in (git_dir, common_dir):
+            ref_path = os.path.join(base, *ref_name.split("/"))
+            if os.path.exists(ref_path):
+                with open(ref_path, "r", encoding="utf-8") as f:
+                    return f.read().strip()
+
+        packed_refs = os.path.join(common_dir, "packed-refs")
+        if os.path.exists(packed_refs):
+            with open(packed_refs, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.strip().split(" ")
+                    if len(parts) == 2 and parts[1] == ref_name:
+                        return parts[0]
+    except OSError as e:
+        logger.warning(f"⚠️ Could not read HEAD for {repo_path}: {e}")
+
+    return None
+
+
+
+
+
+class TemplateSnapshot:
+
+    def __init__(self, source: str, head_commit: Optional[str],
+                 directories: List[Tuple[str, int]], files: List[Tuple[str, int]]):
+        self.source = source
+        self.head_commit = head_commit
+        self.directories = directories
+        self.files = files
+        self.total_bytes = sum(size for _, size in files)
+        self.built_at = datetime.now()
+
+    def is_current(self, head_commit: Optional[str]) -> bool:
+
+        if head_commit != self.head_commit:
+            return False
+
+        try:
+            for rel_dir, mtime_ns in self.directories:
+                path = self.source if rel_dir == "." else os.path.join(self.source, rel_dir)
+                if os.stat(path).st_mtime_ns != mtime_ns:
+                    return False
+        except OSError:
+            return False
+
+        return True
+
+    def describe(self) -> Dict[str, Any]:
+
+        return {
+            "source": self.source,
+            "head_commit": self.head_commit,
+            "directories": len(self.directories),
+            "files": len(self.files),
+            "bytes": self.total_bytes,
+            "built_at": self.built_at.isoformat()
+        }
+
+class TemplateSnapshotCache:
+
+    def __init__(self):
+        self._snapshots: Dict[str, TemplateSnapshot] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.rebuilds = 0
+
+    def get_snapshot(self, source: str) -> TemplateSnapshot:
+
+        source = os.path.abspath(source)
+        repo_root = find_repository_root(source)
+        head_commit = read_head_commit(repo_root) if repo_root else None
+
+        with self._lock:
+            snapshot = self._snapshots.get(source)
+            if snapshot and snapshot.is_current(head_commit):
+                self.hits += 1
+                return snapshot
+
+            snapshot = self._build_snapshot(source, head_commit)
+            self._snapshots[source] = snapshot
+            self.rebuilds += 1
+
+        logger.info(f"📸 Template snapshot built: {source} ({len(snapshot.files)} files, commit {head_commit})")
+        return snapshot
+
+    def _build_snapshot(self, source: str, head_commit: Optional[str]) -> TemplateSnapshot:
+
+        directories = []
+        files = []
+
+        for root, dirs, names in os.walk(source):
+            rel_root = os.path.relpath(root, source)
+            directories.append((rel_root, os.stat(root).st_mtime_ns))
+
+            for file_name in names:
+                rel_file = file_name if rel_root == "." else os.path.join(rel_root, file_name)
+                files.append((rel_file, os.stat(os.path.join(root, file_name)).st_size))
+
+        return TemplateSnapshot(source, head_commit, directories, files)
+
+    def describe(self) -> Dict[str, Any]:
+
+        with self._lock:
+            return {
+                "snapshots": [snapshot.describe() for snapshot in self._snapshots.values()],
+                "hits": self.hits,
+                "rebuilds": self.rebuilds
+            }
+
+
+
+
+
+class TemplateCopyService:
+
+    def __init__(self, max_workers: int = 8, allow_hardlinks: bool = False,
+                 hardlink_exclude: Optional[List[str]] = None):
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="template-copy")
+        self.allow_hardlinks = allow_hardlinks
+
+        # Files rewritten after the copy must never share an inode with the template
+        self.hardlink_exclude = {name.lower() for name in (hardlink_exclude or ["job.ini"])}
+        self._reflink_devices: Dict[int, bool] = {}
+        self._copy_range_devices: Dict[int, bool] = {}
+        self.snapshots = TemplateSnapshotCache()
+
+    async def get_snapshot(self, source: str) -> TemplateSnapshot:
+
+        if not os.path.exists(source):
+            raise Exception(f"Source directory does not exist: {source}")
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.snapshots.get_snapshot, source)
+
+    async def copy_snapshot(self, snapshot: TemplateSnapshot, destination: str,
+                            on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+
+        files, directories = await loop.run_in_executor(
+            self.executor, self._prepare_from_snapshot, snapshot, destination
+        )
+
+        return await self._copy_files(snapshot.source, destination, files, directories, started, on_progress)
+
+    async def copy_tree(self, source: str, destination: str,
+                        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+
+        if not os.path.exists(source):
+            raise Exception(f"Source directory does not exist: {source}")
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+
+        files, directories = await loop.run_in_executor(
+            self.executor, self._prepare_tree, source, destination
+        )
+
+        return await self._copy_files(source, destination, files, directories, started, on_progress)
+
+    async def _copy_files(self, source: str, destination: str, files: List[Tuple[str, str, str]],
+                          directories: int, started: float,
+                          on_progress: Optional[Callable[[Dict[str, Any]], None]]) -> Dict[str, Any]:
+
+        loop = asyncio.get_running_loop()
+        same_fs = await loop.run_in_executor(self.executor, self._same_filesystem, source, destination)
+
+        methods: Dict[str, int] = {}
+        total_bytes = 0
+        total = len(files)
+
+        pending = [
+            loop.run_in_executor(self.executor, self._copy_file, src, dst, rel, same_fs)
+            for rel, src, dst in files
+        ]
+
+        for copied, future in enumerate(asyncio.as_completed(pending), start=1):
+            rel_path, method, size = await future
+            methods[method] = methods.get(method, 0) + 1
+            total_bytes += size
+
+            if on_progress:
+                on_progress({
+                    "event": "file_copied",
+                    "source": os.path.basename(source),
+                    "path": rel_path,
+                    "method": method,
+                    "bytes": size,
+                    "copied": copied,
+                    "total": total
+                })
+
+        return {
+            "files": total,
+            "directories": directories,
+            "bytes": total_bytes,
+            "methods": methods,
+            "same_filesystem": same_fs,
+            "elapsed_seconds": round(time.perf_counter() - started, 3)
+        }
+
+    def _prepare_tree(self, source: str, destination: str) -> Tuple[List[Tuple[str, str, str]], int]:
+
+        files = []
+        directories = 0
+
+        os.makedirs(destination, exist_ok=True)
+
+        for root, dirs, names in os.walk(source):
+            rel_root = os.path.relpath(root, source)
+            dest_root = destination if rel_root == "." else os.path.join(destination, rel_root)
+
+            for dir_name in dirs:
+                os.makedirs(os.path.join(dest_root, dir_name), exist_ok=True)
+                directories += 1
+
+            for file_name in names:
+                rel_file = file_name if rel_root == "." else os.path.join(rel_root, file_name)
+                files.append((rel_file, os.path.join(root, file_name), os.path.join(dest_root, file_name)))
+
+        return files, directories
+
+    def _prepare_from_snapshot(self, snapshot: TemplateSnapshot,
+                               destination: str) -> Tuple[List[Tuple[str, str, str]], int]:
+
+        os.makedirs(destination, exist_ok=True)
+
+        for rel_dir, _ in snapshot.directories:
+            if rel_dir != ".":
+                os.makedirs(os.path.join(destination, rel_dir), exist_ok=True)
+
+        files = [
+            (rel_file, os.path.join(snapshot.source, rel_file), os.path.join(destination, rel_file))
+            for rel_file, _ in snapshot.files
+        ]
+
+        return files, len(snapshot.directories) - 1
+
+    def _same_filesystem(self, source: str, destination: str) -> bool:
+
+        try:
+            probe = destination
+            while not os.path.exists(probe):
+                parent = os.path.dirname(probe)
+                if parent == probe:
+                    return False
+                probe = parent
+
+            return os.stat(source).st_dev == os.stat(probe).st_dev
+        except OSError:
+            return False
+
+    def _copy_file(self, src: str, dst: str, rel_path: str, same_fs: bool) -> Tuple[str, str, int]:
+
+        if same_fs and self.allow_hardlinks and os.path.basename(src).lower() not in self.hardlink_exclude:
+            try:
+                if os.path.lexists(dst):
+                    os.unlink(dst)
+                os.link(src, dst)
+                return rel_path, "hardlink", os.stat(src).st_size
+            except OSError:
+                pass
+
+        method = "copy"
+
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            src_stat = os.fstat(fsrc.fileno())
+            size = src_stat.st_size
+
+            if same_fs and self._try_reflink(fsrc, fdst, src_stat.st_dev):
+                method = "reflink"
+            elif same_fs and self._try_copy_file_range(fsrc, fdst, size, src_stat.st_dev):
+                method = "copy_file_range"
+            else:
+                shutil.copyfileobj(fsrc, fdst, COPY_CHUNK_SIZE)
+
+        shutil.copystat(src, dst)
+        return rel_path, method, size
+
+    def _try_reflink(self, fsrc, fdst, device: int) -> bool:
+
+        if fcntl is None or self._reflink_devices.get(device) is False:
+            return False
+
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            self._reflink_devices[device] = True
+            return True
+        except OSError as e:
+            if e.errno in FAST_PATH_UNSUPPORTED:
+                self._reflink_devices[device] = False
+            return False
+
+    def _try_copy_file_range(self, fsrc, fdst, size: int, device: int) -> bool:
+
+        if not hasattr(os, "copy_file_range") or self._copy_range_devices.get(device) is False:
+            return False
+
+        try:
+            remaining = size
+            while remaining > 0:
+                sent = os.copy_file_range(fsrc.fileno(), fdst.fileno(), min(remaining, COPY_CHUNK_SIZE))
+                if sent == 0:
+                    break
+                remaining -= sent
+
+            if remaining == 0:
+                self._copy_range_devices[device] = True
+                return True
+        except OSError as e:
+            if e.errno in FAST_PATH_UNSUPPORTED:
+                self._copy_range_devices[device] = False
+
+        # Partial copies are discarded so the fallback starts from a clean file
+        fsrc.seek(0)
+        fdst.seek(0)
+        fdst.truncate()
+        return False